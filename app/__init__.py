@@ -31,20 +31,29 @@ def app_init() -> None:
     db_path = os.path.join(state.app_settings["lib_path"], config.db_filename)
     # Load database or create new
     if not os.path.exists(db_path):
-        dbase = Db(db_path)
+        dbase = Db(db_path, config.db_pragmas)
         init_database(dbase)
     else:
-        dbase = Db(db_path)
+        dbase = Db(db_path, config.db_pragmas)
+        update_database(dbase)
     state.dbase = dbase
 
 def init_database(dbase: object) -> None:
     '''
     Fill new database with tables and some categories.
     '''
-    from .models import Book, Author, Authorship, Category, Series
+    from .models import (Book, Author, Authorship, Category, Series,
+        ScanFile, ImportItem, BookSearch, BookContent, BookSort,
+        BookAuthors)
     # Create tables
-    for Model in (Book, Author, Authorship, Category, Series):
+    for Model in (Book, Author, Authorship, Category, Series, ScanFile,
+        ImportItem):
         dbase.create_table(Model)
+    # Full-text search indexes, sort keys and authors names with sync
+    # triggers
+    for query in (*BookSearch.__schema__, *BookContent.__schema__,
+        *BookSort.__schema__, *BookAuthors.__schema__):
+        dbase.execute(query)
     # Create some categories (tags)
     categories = ["new", "prog", "prog_python", "prog_javascript",
         "prog_c", "prog_sql", "comp", "comp_linux", "culture",
@@ -52,7 +61,17 @@ def init_database(dbase: object) -> None:
         "sci-fi","sci-fi_fantasy", "sci-fi_space", "sport"]
     for cat in categories:
         dbase.insert_model(Category(category_name=cat))
+    # New database has all migrations
+    from .utils.migrations import MIGRATIONS
+    dbase.set_user_version(len(MIGRATIONS))
     dbase.commit()
 
+def update_database(dbase: object) -> None:
+    '''
+    Upgrade database created by older version with migrations.
+    '''
+    from .utils.migrations import migrate
+    migrate(dbase)
+
 config = Config()
 state = State()
@@ -6,9 +6,11 @@ import tkinter as tk
 
 from app import config, Style, state
 from .frames import Menu, TopPanel, Content, Footer, WaitProcess
+from .utils.books_list import BooksList
 from .utils.db_operations import DbaseInterface
 from .utils.files_operations import FilesInterface
 from .modules.clean_translit import clean_with_underscore
+from .modules.sqlite import Row
 
 
 class Booklib(tk.Tk):
@@ -61,8 +63,9 @@ class Booklib(tk.Tk):
         self.update_side_preview = (
             self.content_frame.side_frame.update_side_preview)
         self.update_view = self.content_frame.books_frame.update_view
-        self.show_wait_frame = self.wait_frame.show
-        self.get_wait_progress_func = self.wait_frame.get_progress_func
+        self.run_job = self.wait_frame.run_job
+
+        self.after_idle(self.menu.resume_import)
 
     def center_child(self, window: object, size: tuple) -> None:
         '''
@@ -89,31 +92,39 @@ class Booklib(tk.Tk):
         '''
         Interface. Request books for updating books frames.
         '''
-        # Get books - list of dicts
-        if search:
-            values_ = search[0].split() if search[0] else 0
-            books_cont = []
-            for value in values_:
-                books = self.db_funcs.get_books(search=(value, search[1]))
-                books_cont += books if books else []
-            state.books = []
-            for i in books_cont:
-                if i not in state.books:
-                    state.books.append(i)
-        elif state.sel_tag:
+        # Get books - list fetching rows by pages
+        # Keep relevance order of full-text and any of words search
+        order = (None if self.db_funcs.search_ranked(search)
+            else state.last_sort)
+        tag_search = False
+        if not search and state.sel_tag:
             search = (state.sel_tag.dbid, state.sel_tag.tag_type)
-            state.books = self.db_funcs.get_books(search=search,
-                tag_search=True)
-        else:
-            state.books = self.db_funcs.get_books()
+            tag_search = True
+        state.books = BooksList(self.db_funcs, search=search,
+            tag_search=tag_search, order=order)
 
         if hasattr(self, "footer_frame"):
             self.set_footer_text.right(" ".join(
-                ["Books:",str(len(state.books) if state.books else 0)]))
+                ["Books:", str(len(state.books))]))
         if not state.books:
             self.show_message.info("No books found")
+
+    def set_footer_book(self, book: object, book_row: Row) -> None:
+        '''
+        Interface. Show selected book file and found pages of content
+        search or similarity of duplicates in footer.
+        '''
+        hits = book_row["hits"] if "hits" in book_row.keys() else None
+        if "similarity" in book_row.keys():
+            self.set_footer_text.left(''.join([book.file, "  Similarity: ",
+                str(round(book_row["similarity"] * 100)), "%"]))
             return
-        self.sort_books()
+        if not hits:
+            self.set_footer_text.left(book.file)
+            return
+        pages = hits.split(", ")
+        self.set_footer_text.left(''.join([book.file, "  Found on pages: ",
+            ", ".join(pages[:20]), ", ..." if len(pages) > 20 else ""]))
 
     def check_tag_name(self, value: str, tag_type: str) -> [str, None]:
         '''
@@ -136,9 +147,4 @@ class Booklib(tk.Tk):
         '''
         Interface. Sort books.
         '''
-        if not state.books:
-            return
-        db_column, direction = state.last_sort
-        state.books = sorted(state.books,
-            key=lambda x: x[db_column] if not x[db_column] is None else "",
-            reverse=direction)
+        state.books.sort(state.last_sort)
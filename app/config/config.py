@@ -16,8 +16,22 @@ class Config():
     default_thumb: str = "app/static/sample_cover.png"
     img_view_limit: int = 32
     img_cache_max: int = img_view_limit * 4
+    books_page_size: int = img_view_limit * 4 # books rows per query
+    books_pages_cache: int = 16 # pages of books rows kept in memory
+    db_cache_size: int = 1024 # books, authors, tags objects kept in memory
+    import_workers: int = 0 # processes for books import, 0 - all CPU cores
+    import_batch_size: int = 200 # books added to database per transaction
+    duplicates_similarity: float = 0.6 # lowest similarity of near-duplicates
+    # SQLite connection pragmas (name, value). WAL journal lets readers
+    # work while import job writes and needs fsync only at checkpoints.
+    db_pragmas: tuple = (
+        ("journal_mode", "WAL"), ("synchronous", "NORMAL"),
+        ("cache_size", -32000), # page cache in KiB when negative
+        ("mmap_size", 268435456), ("temp_store", "MEMORY"),
+        ("busy_timeout", 5000) # ms to wait for lock of other connection
+    )
     book_types: tuple = ("*.pdf", "*.epub", "*.fb2", "*.fb2.zip", "*.djvu",
-        "*.azw", "*.azw3", "*.mobi", "*.txt", "*.chm")
+        "*.azw", "*.azw3", "*.mobi", "*.txt", "*.chm", "*.zip")
 
     # Columns for treeview (db_name, column name, width)
     # Order depends on database query columns order
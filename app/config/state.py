@@ -11,7 +11,7 @@ class State():
         self.dbase = None # Database object
         self.app_settings = None # app settings loaded from file
         self.app_settings_file = None
-        self.books = [] # List of dicts - books from database
+        self.books = [] # Books rows from database, BooksList
         self.sel_books = [] # selected books - Book objects
         self.last_select = tuple() # tuple of last selected indexes of books
         self.last_sort = ("title", 0) # (sor column in table view, direction)
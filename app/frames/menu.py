@@ -1,7 +1,6 @@
 '''
 Book authors frame.
 '''
-import glob
 import os
 from sys import platform
 import subprocess
@@ -10,6 +9,9 @@ import tkinter as tk
 from tkinter import filedialog as fd
 
 from app import config, state
+from app.utils.content_operations import index_content
+from app.utils.import_operations import import_books, rollback_import
+from app.utils.job_runner import Job
 from .sub1 import BookDetailsMulti, TagDetails, Settings
 from .book_details import BookDetails
 from .views import views_set
@@ -31,6 +33,7 @@ class Menu(tk.Menu):
         self._book_edit_open = False
 
         # Public methods: switch_view, add_books_files, add_books_dir
+        # Public methods: resume_import
         # Public methods: read_book, read_quit, books_edit, tag_edit, export
         # Public methods: copy_to_clipboard, delete_book, delete_tag
 
@@ -60,6 +63,7 @@ class Menu(tk.Menu):
             "Settings": (
                 ("Export library to CSV", self._export_dbase, ""),
                 ("Clean library", self._clean_lib, ""),
+                ("Index books content", self._index_content, ""),
                 ("Switch view", self.switch_view, ""),
                 ("Settings", self._settings, "")
             )
@@ -75,29 +79,42 @@ class Menu(tk.Menu):
                     menu.add_separator()
             self.add_cascade(label=key, menu=menu)
 
-    def _add_books(self, files: list) -> None:
+    def _add_books(self, files: [list, None], folder: str = None,
+        resume: bool = False) -> None:
         '''
         Main function for adding books files.
         Get books info and covers from files. Add books data to database.
+        Books are imported by background job, if folder set - only new
+        or changed files in folder, if resume set - items left by
+        interrupted import.
         '''
-        files_len = len(files)
-        self.root.show_wait_frame(title_label_add="Adding books to library...")
-        self.root.update()
-
-        change_wait_progress = self.root.get_wait_progress_func(files_len)
-        for idx, src_file in enumerate(files):
-            change_wait_progress(idx)
-            book_file_obj = self.root.fd_funcs.get_book_file_data(src_file)
-            if book_file_obj:
-                self.root.db_funcs.add_book(book_file_obj)
-            if self.root.db_funcs.success:
-                self.root.fd_funcs.copy_book_files(book_file_obj)
-
-        # Clean temp files
-        Thread(target=self.root.fd_funcs.clean_temp, args=()).start()
+        if self.root.wait_frame.busy:
+            self.root.show_message.warning("Please wait for current process")
+            return
+        self.root.run_job(Job(import_books, files, folder, resume),
+            "Adding books to library...", on_done=self._add_books_done)
 
-        self.root.wait_frame.withdraw()
+    def _add_books_done(self, job: object) -> None:
+        '''
+        Update books view after import job.
+        '''
         self.root.update_view()
+        self._job_message(job, "Books added")
+
+    def _job_message(self, job: object, text: str) -> None:
+        '''
+        Show result message of finished job.
+        '''
+        if job.errors:
+            self.root.show_message.warning(' '.join(
+                ["Unable to process", str(len(job.errors)), "files"]))
+        elif job.cancelled:
+            self.root.show_message.info("Process cancelled")
+        elif job.skipped:
+            self.root.show_message.info(' '.join([text, "Skipped",
+                str(len(job.skipped)), "files already in library"]))
+        else:
+            self.root.show_message.success(text)
 
     ###           ###
     ### File menu ###
@@ -125,30 +142,50 @@ class Menu(tk.Menu):
         if not folder:
             self.root.show_message.warning("No files chosen")
             return
-        folder = os.path.normpath(folder)
-
-        pattern = ''.join([folder,"/**/*.*"])
-        files_all = glob.iglob(pattern, recursive=True)
-        files = []
-        for file in files_all:
-            if any(file.endswith(x[1:]) for x in config.book_types):
-                files.append(os.path.abspath(file))
-        self._add_books(files)
+        self._add_books(None, folder=os.path.normpath(folder))
+
+    def _index_content(self) -> None:
+        '''
+        Index text of books added since previous indexing for
+        content search.
+        '''
+        if self.root.wait_frame.busy:
+            self.root.show_message.warning("Please wait for current process")
+            return
+        self.root.run_job(Job(index_content), "Indexing books content...",
+            on_done=lambda job: self._job_message(job,
+            "Books content indexed"))
+
+    def resume_import(self) -> None:
+        '''
+        Clean up books import interrupted at previous run and offer
+        to resume it.
+        '''
+        items_len = rollback_import()
+        if not items_len:
+            self.root.db_funcs.clear_import_journal()
+            return
+        mbox = tk.messagebox.askyesno(title="Resume import?",
+            message=''.join(["Previous books import was interrupted.\n",
+            str(items_len), " files left to import. Resume import?"]))
+        if not mbox:
+            self.root.db_funcs.clear_import_journal()
+            return
+        self._add_books(None, resume=True)
 
     def export(self, pdf: bool = False, tag: bool = False) -> None:
         '''
         Save or export to PDF selected books and books by tag.
         '''
-        def get_attr(book: [dict, object], attr: str) -> str:
-            '''
-            Return book value based on type of book.
-            '''
-            return book[attr] if tag else getattr(book, attr)
-
+        if self.root.wait_frame.busy:
+            self.root.show_message.warning("Please wait for current process")
+            return
         if tag:
             ttype = state.sel_tag.tag_type
             tag = getattr(state.sel_tag, '_'.join([ttype, "name"]))
-            books = state.books
+            # All books of tag, list in view fetches rows by pages
+            books = self.root.db_funcs.get_books(
+                search=(state.sel_tag.dbid, ttype), tag_search=True)
         elif state.sel_books:
             books = state.sel_books
         else:
@@ -162,26 +199,41 @@ class Menu(tk.Menu):
             self.root.show_message.warning("No folder set")
             return
 
-        files_len = len(books)
-        self.root.show_wait_frame(title_label_add="Exporting books...")
-        self.root.update()
-
         folder = os.path.join(folder, tag) if tag else os.path.normpath(folder)
-        change_wait_progress = self.root.get_wait_progress_func(files_len)
+        self.root.run_job(Job(self._export_job, books, folder, pdf, tag),
+            "Exporting books...",
+            on_done=lambda job: self._job_message(job, "Export complete"))
+
+    def _export_job(self, job: object, books: list, folder: str, pdf: bool,
+        tag: [str, bool]) -> None:
+        '''
+        Job. Copy or convert books to export folder.
+        '''
+        def get_attr(book: [dict, object], attr: str) -> str:
+            '''
+            Return book value based on type of book.
+            '''
+            return book[attr] if tag else getattr(book, attr)
+
+        files_len = len(books)
         for idx, book in enumerate(books):
-            change_wait_progress(idx)
+            if not job.wait():
+                break
+            job.progress(idx, files_len)
 
             b_file = get_attr(book, "file")
             file = os.path.join(state.app_settings["lib_books"], b_file)
-            if pdf and not file.endswith(".pdf"):
-                self.root.fd_funcs.convert_book_to(file, out_path=folder)
-            else:
-                b_snum = get_attr(book, "series_num")
-                out_file = (''.join([str(b_snum).rjust(3, "0"), "_", b_file])
-                    if b_snum > 0 else b_file)
-                self.root.fd_funcs.copy_book_to(file, folder, out_file)
-
-        self.root.wait_frame.withdraw()
+            try:
+                if pdf and not file.endswith(".pdf"):
+                    self.root.fd_funcs.convert_book_to(file, out_path=folder)
+                else:
+                    b_snum = get_attr(book, "series_num")
+                    out_file = (''.join(
+                        [str(b_snum).rjust(3, "0"), "_", b_file])
+                        if b_snum > 0 else b_file)
+                    self.root.fd_funcs.copy_book_to(file, folder, out_file)
+            except OSError as err:
+                job.error(file, str(err))
 
     ###           ###
     ### Edit menu ###
@@ -236,6 +288,10 @@ class Menu(tk.Menu):
         '''
         Delete selected books.
         '''
+        # Import job writes files before their books rows
+        if self.root.wait_frame.busy:
+            self.root.show_message.warning("Please wait for current process")
+            return
         books = state.sel_books if state.sel_books else []
         if not books:
             self.root.show_message.info("Please select book first")
@@ -250,8 +306,10 @@ class Menu(tk.Menu):
             message=message)
         if not mbox:
             return
-        for book in books:
-            self.root.db_funcs.del_item(book)
+        self.root.db_funcs.delete_many(books)
+        if not self.root.db_funcs.success:
+            self.root.show_message.warning("Unable to delete books")
+            return
         self._clean_lib(silent=True)
 
         state.sel_books = state.last_select = None
@@ -298,12 +356,13 @@ class Menu(tk.Menu):
         if not new_file:
             self.root.show_message.warning("No file choosen")
             return
-        books = self.root.db_funcs.get_books()
-        header_str = ";".join(books[0].keys())
-        books_str = [";".join([str(bv) for bv in book.values()])
-            for book in books]
-        new_file.write("\n".join([header_str, *books_str]))
-        new_file.close()
+        # Books are written while read from database by chunks
+        with new_file:
+            for idx, book in enumerate(self.root.db_funcs.iter_books()):
+                if idx == 0:
+                    new_file.write(";".join(book.keys()))
+                new_file.write("".join(
+                    ["\n", ";".join([str(bv) for bv in book])]))
         self.root.show_message.success("Export successful")
 
     def _clean_lib(self, silent: bool = False) -> None:
@@ -312,13 +371,15 @@ class Menu(tk.Menu):
         Delete unlinked authorships, authors from database.
         Delete files not linked to books in database.
         '''
-        files = self.root.db_funcs.get_files()
-        if not files:
+        # Files of books imported by job are not in database yet
+        if self.root.wait_frame.busy:
+            self.root.show_message.warning("Please wait for current process")
+            return
+        db_files = set()
+        for file_name in self.root.db_funcs.get_files():
+            db_files.update((file_name["file"], file_name["cover"]))
+        if not db_files:
             return
-        db_files = []
-        for file_name in files:
-            db_files.append(file_name["file"])
-            db_files.append(file_name["cover"])
         Thread(target=self.root.fd_funcs.clean_lib_files,
             args=(db_files,)).start()
         self.root.db_funcs.del_authorships_null() # del autorships first
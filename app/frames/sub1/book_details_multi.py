@@ -164,8 +164,10 @@ class BookDetailsMulti(tk.Toplevel):
             return
 
         # Update book details in database from self._book_changes
-        for book in state.sel_books:
-            self.root.db_funcs.update_item(book, self._book_changes)
+        self.root.db_funcs.update_many(state.sel_books, self._book_changes)
+        if not self.root.db_funcs.success:
+            self.root.show_message.warning("Unable to update books")
+            return
         # clear selected book to renew selected book object
         state.sel_books = state.last_select = None
         self.root.show_message.success("Books updated")
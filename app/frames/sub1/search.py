@@ -5,6 +5,8 @@ import tkinter as tk
 from tkinter import ttk
 
 from app import state
+from app.utils.duplicates_operations import find_duplicates
+from app.utils.job_runner import Job
 
 
 class Search(tk.Frame):
@@ -19,10 +21,13 @@ class Search(tk.Frame):
 
         # search values - (database column, combobox item name)
         self._search_values = (("title", "Title"), ("authors", "Authors"),
+            ("series", "Series"), ("category", "Tag"), ("all", "All fields"),
+            ("content", "Content"),
             ("rating", "Rating"), ("isbn", "ISBN"),
             ("time_created", "Created date"), ("pub_date", "Publication date"),
             ("duplicates", "Duplicates"))
         self._combo = self._search_var = self._search_entry = None
+        self._all_words_var = None
 
         self._fill()
 
@@ -47,15 +52,21 @@ class Search(tk.Frame):
         self._search_entry.bind("<Return>", self._search)
         self._search_entry.bind("<FocusIn>", self._search_focus)
 
+        # Books should have all words of search value, else any of words
+        self._all_words_var = tk.BooleanVar()
+        ttk.Checkbutton(self, text="All words",
+            variable=self._all_words_var).grid(row=0, column=3, sticky="W")
+
         search_button=ttk.Button(self, text="Search",
             command=self._search, width=6)
-        search_button.grid(row=0, column=3, sticky="E")
+        search_button.grid(row=0, column=4, sticky="E")
 
     def _combo_selected(self, event: object = None) -> None:
         '''
         Clear search entry. Disable entry if duplicates selected.
         '''
-        entry_state = "disabled" if self._combo.current() == 6 else "normal"
+        val_type = self._search_values[self._combo.current()][0]
+        entry_state = "disabled" if val_type == "duplicates" else "normal"
         self._search_entry.configure(state=entry_state)
         self._search_var.set("")
 
@@ -69,7 +80,7 @@ class Search(tk.Frame):
             self.root.bad_entry(self._search_entry)
             return 0
         if value > 5:
-            value = round(value/25) + (1 if self._combo.current() == 3 else 0)
+            value = round(value/25)
         return value
 
     def _search_focus(self, event: object = None) -> None:
@@ -83,16 +94,41 @@ class Search(tk.Frame):
         Update books by search value
         '''
         sel_idx, val = self._combo.current(), self._search_var.get()
+        val_type = self._search_values[sel_idx][0]
+        # Duplicates are searched without value, entry is disabled
+        if val_type == "duplicates":
+            self._find_duplicates()
+            return
         if not val:
             self.root.show_message.info("No value for search")
             return
-        val_type = self._search_values[sel_idx][0]
-        val = self._check_rate_value(val) if sel_idx == 2 else val
-        # Ignore first char because of sqlite LIKE operator behavior
-        # for unicode characters.
-        val = val[1:] if isinstance(val, str) and not val.isascii() else val
-        val = val.replace("'", "''").lower() if isinstance(val, str) else val
+        val = self._check_rate_value(val) if val_type == "rating" else val
         # Update books table
         state.sel_books = state.last_select = state.sel_tag = None
         self.root.content_frame.side_frame.tag = None
-        self.root.update_view(search=(val, val_type))
+        self.root.update_view(
+            search=(val, val_type, self._all_words_var.get()))
+
+    def _find_duplicates(self) -> None:
+        '''
+        Search near-duplicate books by background job.
+        '''
+        if self.root.wait_frame.busy:
+            self.root.show_message.warning("Please wait for current process")
+            return
+        self.root.run_job(Job(find_duplicates), "Searching duplicates...",
+            on_done=self._duplicates_found)
+
+    def _duplicates_found(self, job: object) -> None:
+        '''
+        Update books by found duplicates clusters.
+        '''
+        if job.cancelled:
+            self.root.show_message.info("Process cancelled")
+            return
+        if job.errors:
+            self.root.show_message.warning("Unable to search duplicates")
+            return
+        state.sel_books = state.last_select = state.sel_tag = None
+        self.root.content_frame.side_frame.tag = None
+        self.root.update_view(search=(job.result, "duplicates"))
@@ -6,6 +6,7 @@ import tkinter as tk
 from PIL import Image, ImageTk
 
 from app import config, state
+from app.modules.sqlite import Row
 
 
 class Cover(tk.Toplevel):
@@ -13,7 +14,7 @@ class Cover(tk.Toplevel):
     Full cover frame class
     '''
     def __init__(self, root: object, container: object,
-        book: [object, dict, None] = None):
+        book: [object, Row, None] = None):
 
         self.root, self.container = root, container
         tk.Toplevel.__init__(self, self.container)
@@ -43,11 +44,11 @@ class Cover(tk.Toplevel):
             str( int(root_y) + int((int(root_h) - wnd_h) / 2) )
         ]))
 
-    def _fill(self, book: [object, dict, None]) -> None:
+    def _fill(self, book: [object, Row, None]) -> None:
         '''
         Show full cover
         '''
-        img_file = ((book["cover"] if isinstance(book, dict) else book.cover)
+        img_file = ((book["cover"] if isinstance(book, Row) else book.cover)
             if book else None)
         thumb_img = (path.join(state.app_settings["lib_covers"], img_file)
             if img_file else self._default_thumb)
@@ -7,6 +7,7 @@ import tkinter as tk
 from PIL import Image, ImageTk
 
 from app import config, state
+from app.modules.sqlite import Row
 
 
 class Preview(tk.Frame):
@@ -15,7 +16,7 @@ class Preview(tk.Frame):
     idx and bind_funcs used for book_shelf frame
     '''
     def __init__(self, root: object, container: object,
-        book: [object, dict] = None, idx: tuple = None,
+        book: [object, Row] = None, idx: tuple = None,
         bind_funcs: tuple = None):
 
         self.root, self.container = root, container
@@ -30,11 +31,11 @@ class Preview(tk.Frame):
         # Public methods: update_img, clear_cache
         self.update_img(book)
 
-    def _get_thumb_img_path(self, book: [object, dict] = None) -> str:
+    def _get_thumb_img_path(self, book: [object, Row] = None) -> str:
         '''
         Return full path for thumbnail image for book.
         '''
-        img_file = ((book["cover"] if isinstance(book, dict) else book.cover)
+        img_file = ((book["cover"] if isinstance(book, Row) else book.cover)
             if book else None)
         thumb_img = (path.join(state.app_settings["lib_thumbs"], img_file)
             if img_file else None)
@@ -42,14 +43,14 @@ class Preview(tk.Frame):
             thumb_img = self._default_thumb
         return thumb_img
 
-    def clear_cache_img(self, book: [object, dict] = None) -> None:
+    def clear_cache_img(self, book: [object, Row] = None) -> None:
         '''
         Clear item in cache. Used if cover file changed.
         '''
         thumb_img = self._get_thumb_img_path(book)
         _load_image(thumb_img, delete=True)
 
-    def update_img(self, book: [object, dict] = None) -> None:
+    def update_img(self, book: [object, Row] = None) -> None:
         '''
         Update image in preview frame.
         '''
@@ -75,11 +76,11 @@ class Preview(tk.Frame):
             self._preview_canvas.bind("<Button-1>", self._bind_funcs[0])
             self._preview_canvas.bind("<Double-1>", self._bind_funcs[1])
 
-    def _draw_text(self, book: [object, dict]) -> None:
+    def _draw_text(self, book: [object, Row]) -> None:
         '''
         Draw text with title and authors on default thumbnails.
         '''
-        title = book["title"] if isinstance(book, dict) else book.title
+        title = book["title"] if isinstance(book, Row) else book.title
         title = title.split()
         new_title = []
         prev = ""
@@ -94,7 +95,7 @@ class Preview(tk.Frame):
         for idx, line in enumerate(new_title):
             self._preview_canvas.create_text(pos_x, pos_y + 20 * (idx + 1),
                 text=line, fill="white", font=('Helvetica 12 bold'))
-        if isinstance(book, dict):
+        if isinstance(book, Row):
             author = " ".join(reversed(
                 book["authors"].split(",")[0].split()[:2]))
             self._preview_canvas.create_text(pos_x, config.thumb_size[1] - 60,
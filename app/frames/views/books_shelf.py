@@ -132,7 +132,8 @@ class BooksShelf(tk.Frame):
     def update_view(self, search: tuple = None, cur_page: int = -1) -> None:
         '''
         Get books and update books table. Search sets:
-        (search val, column name), (0, "bookmark"), (0, "duplicates")
+        (search val, column name, all words), (0, "bookmark"),
+        (clusters of find_duplicates, "duplicates")
         '''
         # Request books if no pages
         if cur_page < 0:
@@ -167,11 +168,11 @@ class BooksShelf(tk.Frame):
         cols, pad, pad_ext, hl_border = self._calculate_columns(self._width)
         col = -1
         book_block_idx = 0
-        start, end = (cur_page * limit, (cur_page + 1) * limit)
+        start = cur_page * limit
+        end = min(start + limit, len(state.books))
         self._book_blocks = []
-        for idx, book in enumerate(state.books):
-            if idx < start or idx >= end:
-                continue
+        for idx in range(start, end):
+            book = state.books[idx]
             if col == cols - 1:
                 col = -1
             row = book_block_idx // cols
@@ -274,4 +275,4 @@ class BooksShelf(tk.Frame):
             state.sel_books.append(book)
         state.last_select = last
         self.root.update_side_preview()
-        self.root.set_footer_text.left(book.file)
+        self.root.set_footer_book(book, state.books[sel_book_idx])
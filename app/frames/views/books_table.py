@@ -5,6 +5,7 @@ import tkinter as tk
 from tkinter import ttk
 
 from app import config, state
+from app.modules.sqlite import Row
 from app.frames.sub2 import MenuPopup
 
 
@@ -18,7 +19,8 @@ class BooksTable(tk.Frame):
         self._colors = self.root.style.colors
         self.configure(borderwidth=0, bg=self._colors["bg"])
 
-        self._books_table = None
+        self._books_table = self._ybooks_scroll = None
+        self._loaded = 0 # number of books rows inserted to table
 
         # Public methods: update_view
 
@@ -38,11 +40,12 @@ class BooksTable(tk.Frame):
         self.rowconfigure(0, weight=1)
         self.columnconfigure(0, weight=1)
 
-        ybooks_scroll = ttk.Scrollbar(self, orient="vertical")
-        ybooks_scroll.grid(row=0, column=1, sticky="NSE")
-        self._books_table = ttk.Treeview(self,yscrollcommand=ybooks_scroll.set,
-            takefocus=1, style="Books.Treeview")
-        ybooks_scroll.config(command=self._books_table.yview)
+        self._ybooks_scroll = ttk.Scrollbar(self, orient="vertical")
+        self._ybooks_scroll.grid(row=0, column=1, sticky="NSE")
+        self._books_table = ttk.Treeview(self,
+            yscrollcommand=self._on_scroll, takefocus=1,
+            style="Books.Treeview")
+        self._ybooks_scroll.config(command=self._books_table.yview)
         self._books_table.tag_configure("odd",
             background=self._colors["treeview_bg1"])
         self._books_table.tag_configure("even",
@@ -76,8 +79,10 @@ class BooksTable(tk.Frame):
         Set focus to last selected book or firs book.
         '''
         frame_tree = self._books_table
-        children = frame_tree.get_children()
         last_sel = state.last_select
+        if last_sel:
+            self._load_books(last_sel[0] + 1)
+        children = frame_tree.get_children()
         if last_sel and last_sel[0] < len(children):
             cur_sel = last_sel[0]
         else:
@@ -108,7 +113,8 @@ class BooksTable(tk.Frame):
     def update_view(self, search: tuple = None, request: bool = True) -> None:
         '''
         Get books and update books table. Search sets:
-        (search val, column name), (0, "bookmark"), (0, "duplicates")
+        (search val, column name, all words), (0, "bookmark"),
+        (clusters of find_duplicates, "duplicates")
         '''
         # Request books
         if request:
@@ -117,6 +123,7 @@ class BooksTable(tk.Frame):
         table_children = self._books_table.get_children()
         if table_children:
             self._books_table.delete(*table_children)
+        self._loaded = 0
         if not state.books:
             return
         # Set showed columns from config
@@ -126,20 +133,37 @@ class BooksTable(tk.Frame):
         # Set columns width.
         for (col_name, _, col_width) in config.columns:
             self._books_table.column(col_name, anchor="w", width=col_width)
-        # Fill books table
-        for i, book in enumerate(state.books):
-            row_values = self._create_book_row_values(book)
-            self._books_table.insert(parent='', index="end", iid=i, text=i,
-                values=row_values, tags=("even" if i % 2 == 0 else "odd",))
+        # Fill books table by first page, next pages loaded on scrolling
+        self._load_books(config.books_page_size)
         self._books_table.update()
         self._table_focus()
 
-    def _create_book_row_values(self, book: dict) -> list:
+    def _load_books(self, count: int) -> None:
+        '''
+        Insert books rows to table up to count.
+        '''
+        end = min(count, len(state.books))
+        for i in range(self._loaded, end):
+            row_values = self._create_book_row_values(state.books[i])
+            self._books_table.insert(parent='', index="end", iid=i, text=i,
+                values=row_values, tags=("even" if i % 2 == 0 else "odd",))
+        self._loaded = max(self._loaded, end)
+
+    def _on_scroll(self, first: str, last: str) -> None:
+        '''
+        Update scrollbar, load next page of books near table end.
+        '''
+        self._ybooks_scroll.set(first, last)
+        if float(last) > 0.9 and self._loaded < len(state.books):
+            count = self._loaded + config.books_page_size
+            self.after_idle(lambda: self._load_books(count))
+
+    def _create_book_row_values(self, book: Row) -> list:
         '''
         Create values for book row in table.
         '''
         row_values = []
-        for key, val in book.items():
+        for key, val in zip(book.keys(), book):
             val = val if val else ""
             if key == "time_created":
                 val = val[:16]
@@ -180,14 +204,13 @@ class BooksTable(tk.Frame):
             return
         if selection == state.last_select:
             return
-        state.sel_books = []
-        for iid in selection:
-            book_id = state.books[iid]["book_id"]
-            book = self.root.db_funcs.get_book(id_=book_id)
-            if book:
-                state.sel_books.append(book)
+        state.sel_books = self.root.db_funcs.get_books_by_ids(
+            [state.books[iid]["book_id"] for iid in selection])
+        if not state.sel_books:
+            return
 
         self.root.update_side_preview()
-        self.root.set_footer_text.left(state.sel_books[0].file)
+        self.root.set_footer_book(state.sel_books[0],
+            state.books[selection[0]])
 
         state.last_select = selection
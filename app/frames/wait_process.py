@@ -20,8 +20,12 @@ class WaitProcess(tk.Toplevel):
             self.attributes('-type', 'dialog')
         self._colors = self.root.style.colors
         self.configure(bg=self._colors["bg"])
+        self.protocol("WM_DELETE_WINDOW", self._cancel)
 
-        # Public methods: show, get_progress_func
+        self._job = self._on_done = None
+        self._poll_ms = 100 # job events polling interval
+
+        # Public methods: show, run_job, busy
 
         self._fill()
 
@@ -50,28 +54,97 @@ class WaitProcess(tk.Toplevel):
         self.percent_label=ttk.Label(pbar_frame, width=4, text="  ")
         self.percent_label.grid(row=0, column=1, padx=(4, 0), sticky="W")
 
+        self._errors_label=ttk.Label(self, anchor="center", text="")
+        self._errors_label.grid(row=3, column=0, sticky="WE")
+
+        buttons_frame = tk.Frame(self, bg=self._colors["bg"])
+        buttons_frame.grid(row=4, column=0, pady=(10, 20))
+        self._pause_button = ttk.Button(buttons_frame, text="Pause",
+            command=self._pause)
+        self._pause_button.grid(row=0, column=0, padx=10)
+        ttk.Button(buttons_frame, text="Cancel", style="Bad.TButton",
+            command=self._cancel).grid(row=0, column=1, padx=10)
+
+    @property
+    def busy(self) -> bool:
+        '''
+        Return True if job is running.
+        '''
+        return bool(self._job)
+
     def show(self, title_label_add: str) -> None:
         '''
         Show and center waitnig window, set title label text.
         '''
         self.deiconify()
-        self.root.center_child(self, (480, 192))
+        self.root.center_child(self, (480, 256))
         self._title_label.configure(text=' '.join(["Please wait.", title_label_add]))
 
-    def get_progress_func(self, amount: int) -> callable:
-        '''
-        Return function for changing progress bar.
-        '''
-        pki = amount / 100 # divider for progress bar value
-        def wrapper(num_of_amount: int) -> None:
-            '''
-            Change wait frame progress bar, status label and percent label.
-            '''
-            num_of_amount += 1
-            bar_value = int((num_of_amount) / pki)
-            self._status_label.configure(text=' '.join(
-                ["Process: book", str(num_of_amount), "of", str(amount)]))
-            self.percent_label.configure(text=''.join([str(bar_value), "%"]))
-            self._progress_bar["value"] = bar_value
-            self.update()
-        return wrapper
+    def run_job(self, job: object, title_label_add: str,
+        on_done: callable = None) -> None:
+        '''
+        Show window, start background job and poll its events.
+        on_done called with job after job finished.
+        '''
+        self._job, self._on_done = job, on_done
+        self._status_label.configure(text=" ".join(
+            ["Process: ", "...", "of", "..."]))
+        self._errors_label.configure(text="")
+        self.percent_label.configure(text="  ")
+        self._pause_button.configure(text="Pause")
+        self._progress_bar["value"] = 0
+        self.show(title_label_add)
+        job.start()
+        self.after(self._poll_ms, self._poll)
+
+    def _poll(self) -> None:
+        '''
+        Read job events and update widgets.
+        '''
+        job = self._job
+        for event in job.get_events():
+            if event[0] == "progress":
+                self._set_progress(*event[1:])
+            elif event[0] in ("error", "skip"):
+                self._errors_label.configure(text=" ".join(
+                    ["Errors:", str(len(job.errors)),
+                    "Skipped:", str(len(job.skipped))]))
+            elif event[0] == "done":
+                self._job = None
+                self.withdraw()
+                # Job wrote books by own connection
+                self.root.db_funcs.refresh_cache()
+                if self._on_done:
+                    self._on_done(job)
+                return
+        self.after(self._poll_ms, self._poll)
+
+    def _set_progress(self, num_of_amount: int, amount: int) -> None:
+        '''
+        Change progress bar, status label and percent label.
+        '''
+        num_of_amount += 1
+        bar_value = int(num_of_amount / (amount / 100))
+        self._status_label.configure(text=' '.join(
+            ["Process: book", str(num_of_amount), "of", str(amount)]))
+        self.percent_label.configure(text=''.join([str(bar_value), "%"]))
+        self._progress_bar["value"] = bar_value
+
+    def _pause(self) -> None:
+        '''
+        Pause or resume job.
+        '''
+        if not self._job:
+            return
+        self._job.pause()
+        self._pause_button.configure(
+            text="Resume" if self._job.paused else "Pause")
+
+    def _cancel(self) -> None:
+        '''
+        Cancel job. Window closed after job stopped.
+        '''
+        if not self._job:
+            return
+        self._job.cancel()
+        self._status_label.configure(text="Cancelling...")
@@ -8,3 +8,9 @@ from .category import Category
 from .series import Series
 from .bookmark import Bookmark
 from .book_file import BookFile
+from .scan_file import ScanFile
+from .import_item import ImportItem
+from .book_search import BookSearch
+from .book_content import BookContent
+from .book_sort import BookSort
+from .book_authors import BookAuthors
@@ -0,0 +1,24 @@
+'''
+Book authors names subquery for triggers of books columns and indexes
+'''
+
+
+def authors_of(book_id: str, last_first: bool = False,
+    patronymic: bool = False, limit: int = None) -> str:
+    '''
+    Return subquery of book authors names for book id expression.
+    Names are concatenated in authorships order, null if book has no
+    authors. Name is first and last name or last name first, with
+    patronymic if set, limit - number of first authors.
+    '''
+    names = ("a.last_name || ' ' || a.first_name" if last_first
+        else "a.first_name || ' ' || a.last_name")
+    if patronymic:
+        names = ''.join([names, " || ifnull(' ' || a.patronymic, '')"])
+    return " ".join(x for x in [
+        "(SELECT group_concat(name, ', ') FROM",
+        "(SELECT", names, "AS name",
+        "FROM authorships s JOIN authors a ON a.author_id = s.author_id",
+        "WHERE s.book_id =", book_id, "ORDER BY s.authorship_id",
+        ''.join(["LIMIT ", str(limit)]) if limit else "", "))",
+    ] if x)
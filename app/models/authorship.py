@@ -10,6 +10,8 @@ class Authorship():
     __tablename__ = "authorships"
     __primary_key__ = "authorship_id"
     __unique_key__ = None # if necessary append "UNIQUE" to key
+    # book_id lookups use UNIQUE (book_id, author_id) index
+    __indexes__ = (("authorships_author_id", "author_id"),)
     authorship_id = "INTEGER PRIMARY KEY NOT null"
     book_id = " ".join(["INTEGER REFERENCES category (book_id)",
         "ON DELETE CASCADE ON UPDATE CASCADE"])
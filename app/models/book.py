@@ -10,6 +10,11 @@ class Book():
     __tablename__ = "books"
     __primary_key__ = "book_id"
     __unique_key__ = None # if necessary append "UNIQUE" to key
+    __indexes__ = ( # (name, columns)
+        ("books_file_hash", "file_hash"), ("books_category", "category"),
+        ("books_series", "series"), ("books_time_created", "time_created"),
+        ("books_title_sort", "title_sort"),
+        ("books_authors_sort", "authors_sort"))
     book_id = "INTEGER PRIMARY KEY NOT null"
     title = "TEXT NOT null"
     pages = "INTEGER DEFAULT 0"
@@ -22,6 +27,13 @@ class Book():
     isbn = "TEXT"
     file = "TEXT NOT null"
     cover = "TEXT"
+    file_hash = "TEXT" # content hash of book file for duplicates check
+    content_indexed = "INTEGER DEFAULT 0" # 1 - text indexed, 2 - no text
+    # Sort keys set by triggers: lowercase title, first author name
+    title_sort = "TEXT NOT null DEFAULT ''"
+    authors_sort = "TEXT NOT null DEFAULT ''"
+    # Authors names for books lists set by triggers
+    authors_display = "TEXT NOT null DEFAULT ''"
     category = " ".join(["INTEGER REFERENCES category (category_id)",
         "ON DELETE CASCADE ON UPDATE CASCADE"])
     series = " ".join(["INTEGER REFERENCES category (series_id)",
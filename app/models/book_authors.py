@@ -0,0 +1,45 @@
+'''
+Book authors names model for SQLite
+'''
+from .authors_subquery import authors_of
+
+
+def _authors_of(book_id: str) -> str:
+    '''
+    Return subquery of concatenated authors names for book id expression.
+    '''
+    return ''.join(["ifnull(", authors_of(book_id, last_first=True),
+        ", '')"])
+
+
+class BookAuthors():
+    '''
+    Concatenated authors names of book for books lists.
+    Names are books column kept in sync with authorships and authors
+    by triggers, created with __schema__ statements. Books lists are
+    read without authors joins and grouping.
+    '''
+    __schema__ = (
+        " ".join(["CREATE TRIGGER IF NOT EXISTS authorships_display_insert",
+            "AFTER INSERT ON authorships BEGIN",
+            "UPDATE books SET authors_display =", _authors_of("NEW.book_id"),
+            "WHERE book_id = NEW.book_id; END;"]),
+        " ".join(["CREATE TRIGGER IF NOT EXISTS authorships_display_delete",
+            "AFTER DELETE ON authorships BEGIN",
+            "UPDATE books SET authors_display =", _authors_of("OLD.book_id"),
+            "WHERE book_id = OLD.book_id; END;"]),
+        " ".join(["CREATE TRIGGER IF NOT EXISTS authorships_display_update",
+            "AFTER UPDATE OF book_id, author_id ON authorships BEGIN",
+            "UPDATE books SET authors_display =",
+            _authors_of("books.book_id"),
+            "WHERE book_id IN (OLD.book_id, NEW.book_id); END;"]),
+        " ".join(["CREATE TRIGGER IF NOT EXISTS authors_display_update",
+            "AFTER UPDATE OF first_name, last_name ON authors BEGIN",
+            "UPDATE books SET authors_display =",
+            _authors_of("books.book_id"),
+            "WHERE book_id IN (SELECT book_id FROM authorships",
+            "WHERE author_id = NEW.author_id); END;"]),
+    )
+    # Fill names for existing books
+    __fill__ = " ".join(["UPDATE books SET authors_display =",
+        _authors_of("books.book_id"), ";"])
@@ -0,0 +1,26 @@
+'''
+Book content model for SQLite
+'''
+
+
+class BookContent():
+    '''
+    FTS5 full-text index of books pages text.
+    Row id is book_id << page_bits | page number, so pages of book are
+    rows range. Index is not a model table, it is created with __schema__
+    statements, book pages deleted with book by trigger.
+    '''
+    __tablename__ = "books_content"
+    page_bits = 20
+    max_page = (1 << page_bits) - 1
+    __schema__ = (
+        " ".join(["CREATE VIRTUAL TABLE IF NOT EXISTS books_content",
+            "USING fts5(text, tokenize = 'unicode61 remove_diacritics 2',",
+            "prefix = '3');"]),
+        " ".join(["CREATE TRIGGER IF NOT EXISTS books_content_delete",
+            "AFTER DELETE ON books BEGIN",
+            "DELETE FROM books_content WHERE rowid BETWEEN",
+            "OLD.book_id <<", str(page_bits), "AND",
+            "(OLD.book_id <<", str(page_bits), ") +", str(max_page),
+            "; END;"]),
+    )
@@ -9,12 +9,20 @@ class BookFile():
     '''
     def __init__(self, src_file: str, date: [object, None], pages: int):
         self.src_file = src_file
+        self.src_member = None # book file name in zip archive src_file
         self.title = None
         self.authors = None
         self.pub_date = date
         self.pages = pages
         self.book_file_name = None
         self.cover_file_name = None
+        self.cover_img = None # cover PIL image extracted with metadata
+        self.cover_data = None # png encoded cover created by import worker
+        self.thumb_data = None # png encoded thumbnail
+        self.file_hash = None
+        self.duplicate = False # same file content exists in library
+        self.book_id = None # database id set when book added
+        self.journal_id = None # import journal item id
 
     def __repr__(self):
         '''
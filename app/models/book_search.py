@@ -0,0 +1,87 @@
+'''
+Book search model for SQLite
+'''
+from .authors_subquery import authors_of
+
+
+def _authors_of(book_id: str) -> str:
+    '''
+    Return subquery of authors full names for book id expression.
+    '''
+    return authors_of(book_id, patronymic=True)
+
+def _tag_of(tag_type: str, tag_id: str) -> str:
+    '''
+    Return subquery of category or series name for tag id expression.
+    '''
+    return ''.join(["(SELECT ", tag_type, "_name FROM ",
+        "categories" if tag_type == "category" else "series",
+        " WHERE ", tag_type, "_id = ", tag_id, ")"])
+
+
+class BookSearch():
+    '''
+    FTS5 full-text index of books for search.
+    Row id is book_id. Index is not a model table, it is created with
+    __schema__ statements and kept in sync with books, authors, tags
+    by triggers.
+    '''
+    __tablename__ = "books_fts"
+    __columns__ = ("title", "authors", "series", "category", "isbn")
+    __schema__ = (
+        " ".join(["CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(",
+            "title, authors, series, category, isbn,",
+            "tokenize = 'unicode61 remove_diacritics 2',",
+            "prefix = '2 3');"]),
+        " ".join(["CREATE TRIGGER IF NOT EXISTS books_fts_insert",
+            "AFTER INSERT ON books BEGIN",
+            "INSERT INTO books_fts",
+            "(rowid, title, authors, series, category, isbn) VALUES (",
+            "NEW.book_id, NEW.title,", _authors_of("NEW.book_id"), ",",
+            _tag_of("series", "NEW.series"), ",",
+            _tag_of("category", "NEW.category"), ", NEW.isbn); END;"]),
+        " ".join(["CREATE TRIGGER IF NOT EXISTS books_fts_update",
+            "AFTER UPDATE OF title, series, category, isbn ON books BEGIN",
+            "UPDATE books_fts SET title = NEW.title,",
+            "series =", _tag_of("series", "NEW.series"), ",",
+            "category =", _tag_of("category", "NEW.category"), ",",
+            "isbn = NEW.isbn WHERE rowid = NEW.book_id; END;"]),
+        " ".join(["CREATE TRIGGER IF NOT EXISTS books_fts_delete",
+            "AFTER DELETE ON books BEGIN",
+            "DELETE FROM books_fts WHERE rowid = OLD.book_id; END;"]),
+        " ".join(["CREATE TRIGGER IF NOT EXISTS authorships_fts_insert",
+            "AFTER INSERT ON authorships BEGIN",
+            "UPDATE books_fts SET authors =", _authors_of("NEW.book_id"),
+            "WHERE rowid = NEW.book_id; END;"]),
+        " ".join(["CREATE TRIGGER IF NOT EXISTS authorships_fts_delete",
+            "AFTER DELETE ON authorships BEGIN",
+            "UPDATE books_fts SET authors =", _authors_of("OLD.book_id"),
+            "WHERE rowid = OLD.book_id; END;"]),
+        " ".join(["CREATE TRIGGER IF NOT EXISTS authorships_fts_update",
+            "AFTER UPDATE OF book_id, author_id ON authorships BEGIN",
+            "UPDATE books_fts SET authors =", _authors_of("books_fts.rowid"),
+            "WHERE rowid IN (OLD.book_id, NEW.book_id); END;"]),
+        " ".join(["CREATE TRIGGER IF NOT EXISTS authors_fts_update",
+            "AFTER UPDATE OF first_name, last_name, patronymic ON authors",
+            "BEGIN UPDATE books_fts SET authors =",
+            _authors_of("books_fts.rowid"),
+            "WHERE rowid IN (SELECT book_id FROM authorships",
+            "WHERE author_id = NEW.author_id); END;"]),
+        " ".join(["CREATE TRIGGER IF NOT EXISTS categories_fts_update",
+            "AFTER UPDATE OF category_name ON categories BEGIN",
+            "UPDATE books_fts SET category = NEW.category_name",
+            "WHERE rowid IN (SELECT book_id FROM books",
+            "WHERE category = NEW.category_id); END;"]),
+        " ".join(["CREATE TRIGGER IF NOT EXISTS series_fts_update",
+            "AFTER UPDATE OF series_name ON series BEGIN",
+            "UPDATE books_fts SET series = NEW.series_name",
+            "WHERE rowid IN (SELECT book_id FROM books",
+            "WHERE series = NEW.series_id); END;"]),
+    )
+    # Fill index for existing books
+    __fill__ = " ".join([
+        "INSERT INTO books_fts",
+        "(rowid, title, authors, series, category, isbn)",
+        "SELECT book_id, title,", _authors_of("books.book_id"), ",",
+        _tag_of("series", "books.series"), ",",
+        _tag_of("category", "books.category"), ", isbn FROM books;"])
@@ -0,0 +1,58 @@
+'''
+Book sort keys model for SQLite
+'''
+from .authors_subquery import authors_of
+
+
+def _first_author_of(book_id: str) -> str:
+    '''
+    Return subquery of case folded first author name for book id
+    expression.
+    '''
+    return ''.join(["casefold(ifnull(",
+        authors_of(book_id, last_first=True, limit=1), ", ''))"])
+
+
+class BookSort():
+    '''
+    Sort keys of books: normalized title and first author name.
+    Keys are books columns kept in sync by triggers, created with
+    __schema__ statements. Sorting by keys uses books indexes.
+    Keys are case folded by casefold function of Db connections, SQLite
+    lower() folds only ASCII letters.
+    '''
+    __columns__ = {"title": "title_sort", "authors": "authors_sort"}
+    __schema__ = (
+        " ".join(["CREATE TRIGGER IF NOT EXISTS books_sort_insert",
+            "AFTER INSERT ON books BEGIN",
+            "UPDATE books SET title_sort = casefold(trim(NEW.title)),",
+            "authors_sort =", _first_author_of("NEW.book_id"),
+            "WHERE book_id = NEW.book_id; END;"]),
+        " ".join(["CREATE TRIGGER IF NOT EXISTS books_sort_update",
+            "AFTER UPDATE OF title ON books BEGIN",
+            "UPDATE books SET title_sort = casefold(trim(NEW.title))",
+            "WHERE book_id = NEW.book_id; END;"]),
+        " ".join(["CREATE TRIGGER IF NOT EXISTS authorships_sort_insert",
+            "AFTER INSERT ON authorships BEGIN",
+            "UPDATE books SET authors_sort =", _first_author_of("NEW.book_id"),
+            "WHERE book_id = NEW.book_id; END;"]),
+        " ".join(["CREATE TRIGGER IF NOT EXISTS authorships_sort_delete",
+            "AFTER DELETE ON authorships BEGIN",
+            "UPDATE books SET authors_sort =", _first_author_of("OLD.book_id"),
+            "WHERE book_id = OLD.book_id; END;"]),
+        " ".join(["CREATE TRIGGER IF NOT EXISTS authorships_sort_update",
+            "AFTER UPDATE OF book_id, author_id ON authorships BEGIN",
+            "UPDATE books SET authors_sort =",
+            _first_author_of("books.book_id"),
+            "WHERE book_id IN (OLD.book_id, NEW.book_id); END;"]),
+        " ".join(["CREATE TRIGGER IF NOT EXISTS authors_sort_update",
+            "AFTER UPDATE OF first_name, last_name ON authors BEGIN",
+            "UPDATE books SET authors_sort =",
+            _first_author_of("books.book_id"),
+            "WHERE book_id IN (SELECT book_id FROM authorships",
+            "WHERE author_id = NEW.author_id); END;"]),
+    )
+    # Fill keys for existing books
+    __fill__ = " ".join([
+        "UPDATE books SET title_sort = casefold(trim(title)),",
+        "authors_sort =", _first_author_of("books.book_id"), ";"])
@@ -0,0 +1,38 @@
+'''
+Import item model for SQLite
+'''
+
+
+class ImportItem():
+    '''
+    Import journal item model for database.
+    Stage of each source book file of running import, used to resume
+    interrupted import and remove its partially copied files.
+    '''
+    __tablename__ = "import_journal"
+    __primary_key__ = "item_id"
+    __unique_key__ = None # if necessary append "UNIQUE" to key
+    item_id = "INTEGER PRIMARY KEY NOT null"
+    path = "TEXT NOT null" # book file or zip archive
+    member = "TEXT" # book file name in zip archive
+    size = "INTEGER" # scanned file size and modification time in ns
+    mtime = "INTEGER"
+    stage = "TEXT NOT null" # queued, parsed, inserted, skipped, failed
+    book_file = "TEXT" # library file names reserved at parsed stage
+    cover_file = "TEXT"
+
+    def __init__(self, **kwargs):
+        '''
+        Set object attributes as class key = init kwarg.
+        '''
+        for key, val in kwargs.items():
+            if key in __class__.__dict__:
+                setattr(self, key, val)
+        self._dbid = self.item_id
+
+    @property
+    def dbid(self):
+        '''
+        Return database id.
+        '''
+        return self._dbid
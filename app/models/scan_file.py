@@ -0,0 +1,34 @@
+'''
+Scan file model for SQLite
+'''
+
+
+class ScanFile():
+    '''
+    Scanned file model for database.
+    Manifest of files imported from folders for incremental re-scan.
+    '''
+    __tablename__ = "scan_files"
+    __primary_key__ = "scan_file_id"
+    __unique_key__ = None # if necessary append "UNIQUE" to key
+    scan_file_id = "INTEGER PRIMARY KEY NOT null"
+    path = "TEXT NOT null"
+    size = "INTEGER NOT null"
+    mtime = "INTEGER NOT null" # modification time in nanoseconds
+    UNIQUE = "(path)"
+
+    def __init__(self, **kwargs):
+        '''
+        Set object attributes as class key = init kwarg.
+        '''
+        for key, val in kwargs.items():
+            if key in __class__.__dict__:
+                setattr(self, key, val)
+        self._dbid = self.scan_file_id
+
+    @property
+    def dbid(self):
+        '''
+        Return database id.
+        '''
+        return self._dbid
@@ -0,0 +1,34 @@
+'''
+Load and encode cover images in memory.
+'''
+import io
+from PIL import Image
+
+
+def load_cover(data: [bytes, str], max_size: tuple = None) -> [object, None]:
+    '''
+    Decode image from bytes or file to RGB PIL image, resize by max_size.
+    JPEG images decoded at reduced scale if bigger than max_size.
+    '''
+    try:
+        im = Image.open(io.BytesIO(data) if isinstance(data, bytes) else data)
+        if max_size:
+            im.draft("RGB", max_size) # Only JPEG, no effect for others
+            im.thumbnail(max_size)
+        if not im.mode == "RGB":
+            im = im.convert("RGB")
+        im.load()
+    except Exception:
+        return None
+    return im
+
+def encode_cover(im: object, thumb_size: tuple) -> tuple:
+    '''
+    Encode cover image and its thumbnail to png, return bytes of both.
+    '''
+    cover_buf, thumb_buf = io.BytesIO(), io.BytesIO()
+    im.save(cover_buf, format="PNG")
+    thumb = im.copy()
+    thumb.thumbnail(thumb_size)
+    thumb.save(thumb_buf, format="PNG")
+    return (cover_buf.getvalue(), thumb_buf.getvalue())
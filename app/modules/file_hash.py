@@ -0,0 +1,28 @@
+'''
+Get hash of file content.
+'''
+from hashlib import blake2b
+
+
+def get_file_hash(file, chunk_size: int = 1024 * 1024) -> [str, None]:
+    '''
+    Return hex digest of file content. File read by chunks.
+    File could be path or file object opened in binary mode.
+    '''
+    file_hash = blake2b(digest_size=20)
+    try:
+        if isinstance(file, str):
+            with open(file, "rb") as fobj:
+                _update_hash(file_hash, fobj, chunk_size)
+        else:
+            _update_hash(file_hash, file, chunk_size)
+    except OSError:
+        return None
+    return file_hash.hexdigest()
+
+def _update_hash(file_hash: object, fobj: object, chunk_size: int) -> None:
+    '''
+    Update hash by file chunks.
+    '''
+    for chunk in iter(lambda: fobj.read(chunk_size), b""):
+        file_hash.update(chunk)
@@ -1,10 +1,10 @@
-import io
 import sys
 import fitz
 from os import path, mkdir
 from tempfile import mkdtemp
 from datetime import date
-from PIL import Image
+
+from .cover_image import load_cover
 
 
 def get_meta(file) -> [list, None]:
@@ -18,17 +18,32 @@ def get_meta(file) -> [list, None]:
         return None
     return meta
 
-def get_book_info(file) -> tuple:
+def get_book_data(file, max_size = None, filetype = None,
+    cover = True) -> tuple:
     '''
-    Get title, authors and date from book file
+    Get title, authors, date, pages and cover image from book file
+    with single document open. Cover is PIL image or None, not
+    extracted if cover is False.
+    File could be path or bytes of book file with filetype (extension).
     '''
-    pages = 0
     try:
-        with fitz.open(file) as doc:
-            meta = doc.metadata
-            pages = doc.page_count
+        doc = (fitz.open(stream=file, filetype=filetype)
+            if isinstance(file, bytes) else fitz.open(file))
     except Exception as err:
-        return (None, None, None, pages)
+        return (None, None, None, 0, None)
+    with doc:
+        title, authors, date_ = _parse_meta(doc.metadata)
+        pages = doc.page_count
+        try:
+            cover = _get_cover(doc, max_size) if cover else None
+        except Exception:
+            cover = None
+    return (title, authors, date_, pages, cover)
+
+def _parse_meta(meta: dict) -> tuple:
+    '''
+    Return title, authors and date from document metadata
+    '''
     title, authors, date_ = meta["title"], meta["author"], meta["creationDate"]
     except_ = ["unknown", "untitled", ""]
     title = None if any([(i == title.lower()) for i in except_]) else title
@@ -53,7 +68,7 @@ def get_book_info(file) -> tuple:
             date_ = date.fromisoformat(iso)
         except:
             pass
-    return (title, authors_out, date_, pages)
+    return (title, authors_out, date_)
 
 def get_toc(file) -> [list, None]:
     '''
@@ -78,6 +93,19 @@ def get_data(file) -> [list, None]:
         return None
     return text
 
+def get_pages_text(file) -> [tuple, None]:
+    '''
+    Get text of book pages. Return (pages count, list of
+    (page number from 1, text) for pages with text).
+    '''
+    try:
+        with fitz.open(file) as doc:
+            pages = [(idx + 1, page.get_text("text"))
+                for idx, page in enumerate(doc)]
+    except Exception:
+        return None
+    return (len(pages), [(idx, text) for idx, text in pages if text.strip()])
+
 def get_pdf_images(file, page = 0) -> [list, None]:
     '''
     Get images from pdf file
@@ -106,14 +134,12 @@ def get_pdf_images(file, page = 0) -> [list, None]:
     doc = None
     return images
 
-def get_cover_img(file, max_size = None,
-    prefix = "img_from_book_") -> [str, None]:
+def _get_cover(doc, max_size = None) -> [object, None]:
     '''
-    Get cover image from book, convert it to RGB, resize by max_size
+    Get first big image from first page of opened document as RGB
+    PIL image, resize by max_size
     '''
-    try:
-        doc = fitz.open(file)
-    except Exception as err:
+    if not doc.page_count:
         return None
     page_ = doc.load_page(0)
     d = page_.get_text("dict")
@@ -126,22 +152,7 @@ def get_cover_img(file, max_size = None,
     if not imgblock:
         return None
 
-    try:
-        im = Image.open(io.BytesIO(imgblock["image"]))
-    except:
-        return None
-    if not im.mode == "RGB":
-        im = im.convert("RGB")
-    if max_size:
-        im.thumbnail((max_size[0], max_size[1]))
-    tmp_path = path.normpath(mkdtemp(prefix=prefix))
-    tmp_cover = path.join(tmp_path, "cover.png")
-    im.save(tmp_cover)
-
-    doc.close()
-    doc = None
-
-    return tmp_cover
+    return load_cover(imgblock["image"], max_size)
 
 def convert_to_pdf(file, out_path = None) -> None:
     '''
@@ -0,0 +1,155 @@
+'''
+Find near-duplicate books by normalized title and first author.
+Candidates are blocked by MinHash signatures of title trigrams, so
+books are not compared all to all.
+'''
+import random
+import re
+import unicodedata
+from hashlib import blake2b
+
+from .clean_translit import chars_to_ascii, clean_with_space
+
+_brackets = re.compile(r"[\(\[\{][^\)\]\}]*[\)\]\}]") # "(2nd ed)", "[pdf]"
+_ordinal = re.compile(r"\d+(st|nd|rd|th)")
+_stop_words = frozenset(("ed", "edn", "edition", "izd", "izdanie"))
+# Fold letters of different transliterations: "tolstoj", "tolstoy"
+_fold = str.maketrans("yjw", "iiv")
+_mask = (1 << 30) - 1 # grams hashes fit in one digit of python int
+
+
+def find_near_duplicates(books: iter, threshold: float = 0.6,
+    bands: int = 8, rows: int = 3, bucket_max: int = 200,
+    progress: callable = None) -> list:
+    '''
+    Find clusters of near-duplicate books.
+    Books - iterable of (book id, title, first author name).
+    Books are pairs if titles trigrams similarity is at least threshold
+    and authors are similar or unknown. Pairs are searched only among
+    books with equal band of signature (bands * rows values), buckets
+    bigger than bucket_max are skipped.
+    Progress called as progress(done, amount) while searching, search
+    is stopped and empty list returned if it returns False.
+    Return [(score, [book ids]),...] sorted by score and size, score is
+    the lowest pair similarity linking cluster.
+    '''
+    # Books with equal normalized title and author are one unit
+    units, names = {}, {}
+    for book_id, title, author in books:
+        if author not in names:
+            names[author] = normalize(author or "").split(" ")[0]
+        key = (normalize(title or ""), names[author])
+        if key[0]:
+            units.setdefault(key, []).append(book_id)
+    keys = list(units)
+    titles = [_trigrams(x[0]) for x in keys]
+    authors = [_trigrams(x[1]) if x[1] else None for x in keys]
+
+    rand = random.Random(bands * rows) # same permutations for each run
+    perms = [rand.getrandbits(30) for _ in range(bands * rows)]
+    buckets, hashes = {}, {} # hashes {gram: stable hash} shared by titles
+    amount = len(keys) * 2 # signatures, then buckets scaled to keys
+    for idx, grams in enumerate(titles):
+        if progress and not idx % 1000 and progress(idx, amount) is False:
+            return []
+        sign = _signature(grams, perms, hashes)
+        for band in range(bands):
+            buckets.setdefault((band, sign[band * rows:(band + 1) * rows]),
+                []).append(idx)
+
+    parents = list(range(len(keys)))
+    scores = [1.0] * len(keys) # lowest link score of cluster by root
+    checked = set()
+    for pos, bucket in enumerate(buckets.values()):
+        if (progress and not pos % 10000 and progress(len(keys)
+            + pos * len(keys) // len(buckets), amount) is False):
+            return []
+        if len(bucket) < 2 or len(bucket) > bucket_max:
+            continue
+        for idx, first in enumerate(bucket):
+            for second in bucket[idx + 1:]:
+                if (first, second) in checked:
+                    continue
+                checked.add((first, second))
+                score = _similarity(titles[first], titles[second],
+                    authors[first], authors[second])
+                if score >= threshold:
+                    _union(parents, scores, first, second, score)
+
+    clusters = {}
+    for idx, key in enumerate(keys):
+        clusters.setdefault(_find(parents, idx), []).extend(units[key])
+    result = [(scores[root], ids) for root, ids in clusters.items()
+        if len(ids) > 1]
+    result.sort(key=lambda x: (-x[0], -len(x[1])))
+    return result
+
+def normalize(text: str) -> str:
+    '''
+    Return lowercase ascii words of text without bracketed parts,
+    edition marks and diacritics, "&" as "and", transliteration
+    letters folded.
+    '''
+    text = text.lower().replace("&", " and ")
+    text = text if text.isascii() else chars_to_ascii(text)
+    text = unicodedata.normalize("NFKD", _brackets.sub(" ", text))
+    text = clean_with_space(''.join(
+        [x for x in text if not unicodedata.combining(x)]))
+    words = [x for x in re.findall(r"\w+", text)
+        if x not in _stop_words and not _ordinal.fullmatch(x)]
+    return " ".join(words).translate(_fold)
+
+def _trigrams(text: str) -> frozenset:
+    '''
+    Return character trigrams of text padded by spaces.
+    '''
+    text = ''.join([" ", text, " "])
+    return frozenset(text[x:x + 3] for x in range(len(text) - 2))
+
+def _signature(grams: frozenset, perms: list, hashes: dict) -> tuple:
+    '''
+    Return MinHash signature: minimum of grams hashes for each of
+    permutations, permutation is xor of hash with random mask.
+    Grams hashes are not salted per process like hash() and are
+    stored in hashes dict.
+    '''
+    values = []
+    for gram in grams:
+        if gram not in hashes:
+            hashes[gram] = int.from_bytes(blake2b(gram.encode(),
+                digest_size=4).digest(), "little") & _mask
+        values.append(hashes[gram])
+    return tuple(min(map(x.__xor__, values)) for x in perms)
+
+def _similarity(title1: frozenset, title2: frozenset, author1: frozenset,
+    author2: frozenset) -> float:
+    '''
+    Return similarity of books by titles and authors trigrams.
+    Authors count if both known and should be similar.
+    '''
+    score = len(title1 & title2) / len(title1 | title2)
+    if not author1 or not author2:
+        return score
+    author_score = len(author1 & author2) / len(author1 | author2)
+    if author_score < 0.5:
+        return 0.0
+    return (2 * score + author_score) / 3
+
+def _find(parents: list, idx: int) -> int:
+    '''
+    Return root of union-find tree, compress path.
+    '''
+    while parents[idx] != idx:
+        parents[idx] = parents[parents[idx]]
+        idx = parents[idx]
+    return idx
+
+def _union(parents: list, scores: list, first: int, second: int,
+    score: float) -> None:
+    '''
+    Join clusters of units, keep lowest link score.
+    '''
+    root1, root2 = _find(parents, first), _find(parents, second)
+    if root1 != root2:
+        parents[root2] = root1
+    scores[root1] = min(scores[root1], scores[root2], score)
@@ -1 +1 @@
-from .sql_toolkit import Db
+from .sql_toolkit import Db, Row
@@ -4,26 +4,70 @@ Module for SQLite
 import sqlite3
 from os import path
 
+# Compact result row: values by column name or index, shared header
+Row = sqlite3.Row
+
+
+def _casefold(value):
+    '''
+    Return case folded text for casefold SQL function, lower() of
+    SQLite folds only ASCII letters.
+    '''
+    return value.casefold() if isinstance(value, str) else value
+
 
 class Db():
     '''
     DB class with transactions methods
     '''
-    def __init__(self, db_file = None):
+    # Query templates and columns cache per Model, shared by connections
+    _templates = {}
+    _columns = {}
+    _max_params = 900 # query parameters, limit of old SQLite builds is 999
+
+    def __init__(self, db_file = None, pragmas = ()):
         '''
-        Init database connection setting
+        Init database connection setting.
+        Pragmas - ((name, value),...) applied to each new connection.
         '''
         self._db_file = path.normpath(db_file)
+        self._pragmas = tuple(pragmas)
         self._connection = None
         self._last_row_id = None
 
+    @property
+    def db_file(self):
+        '''
+        Return database file path. Used for new connections in threads.
+        '''
+        return self._db_file
+
+    @property
+    def pragmas(self):
+        '''
+        Return connection pragmas. Used for new connections in threads.
+        '''
+        return self._pragmas
+
+    @property
+    def max_params(self):
+        '''
+        Return parameters limit of query. Used for chunks of ids.
+        '''
+        return self._max_params
+
     def _connect(self):
         '''
-        Create connection.
+        Create connection and apply pragmas.
         '''
         if self._connection:
             return
         self._connection = sqlite3.connect(self._db_file)
+        self._connection.create_function("casefold", 1, _casefold,
+            deterministic=True)
+        for name_, value in self._pragmas:
+            self._connection.execute(
+                " ".join(["PRAGMA", name_, "=", str(value), ";"]))
 
     def close_connection(self):
         '''
@@ -51,9 +95,9 @@ class Db():
         if self._connection:
             self._connection.rollback()
 
-    def _transaction(self, query):
+    def _transaction(self, query, params = (), compact = False):
         '''
-        Executing transactions.
+        Executing transactions. Compact - fetch Row objects.
         '''
         #print(query)
         if not query:
@@ -61,7 +105,9 @@ class Db():
         self._connect() # Connect only if connection is closed or broken
         header = result = None
         cursor = self._connection.cursor()
-        cursor.execute(query)
+        if compact:
+            cursor.row_factory = Row
+        cursor.execute(query, params)
         try:
             header = cursor.description
             result = cursor.fetchall()
@@ -95,8 +141,48 @@ class Db():
             [" ".join([key, d[key]]) for key in d if self._key_accepted(d, key)]
         )
         query = " ".join(
-            ["CREATE TABLE", Model.__tablename__, "(", keylist, ");"])
+            ["CREATE TABLE IF NOT EXISTS", Model.__tablename__,
+            "(", keylist, ");"])
         self._transaction(query)
+        self.create_indexes(Model)
+
+    def get_user_version(self):
+        '''
+        Return database schema version
+        '''
+        _, result = self._transaction("PRAGMA user_version;")
+        return result[0][0]
+
+    def set_user_version(self, version):
+        '''
+        Set database schema version
+        '''
+        self._transaction(" ".join(["PRAGMA user_version =",
+            str(int(version)), ";"]))
+
+    def create_indexes(self, Model):
+        '''
+        Create indexes from Model __indexes__ if not exist
+        '''
+        for name_, columns in getattr(Model, "__indexes__", ()):
+            self._transaction(" ".join(["CREATE INDEX IF NOT EXISTS", name_,
+                "ON", Model.__tablename__, "(", columns, ");"]))
+
+    def add_columns(self, Model):
+        '''
+        Add Model columns missing in existing table
+        '''
+        _, result = self._transaction(" ".join(
+            ["PRAGMA table_info(", Model.__tablename__, ");"]))
+        table_columns = [row[1] for row in result]
+        d = Model.__dict__
+        for key in d:
+            # Skip table constraints like UNIQUE
+            if (not self._key_accepted(d, key) or key.isupper()
+                or key in table_columns):
+                continue
+            self._transaction(" ".join(["ALTER TABLE", Model.__tablename__,
+                "ADD COLUMN", key, d[key], ";"]))
 
     def _result_parser(self, header, result, Model = None):
         '''
@@ -110,99 +196,179 @@ class Db():
             return None
         return items_list
 
-    def execute(self, query, Model = None):
+    def execute(self, query, Model = None, params = (), compact = False):
         '''
-        Execute custom query
+        Execute custom query. Compact - return list of Row objects
+        instead of dicts, rows are not parsed.
         '''
-        header, result = self._transaction(query)
+        header, result = self._transaction(query, params, compact)
+        if result and compact:
+            return result
         if result:
             return self._result_parser(header, result, Model=Model)
         else:
             return None
 
+    def iter_query(self, query, params = (), size = 1000):
+        '''
+        Execute query and yield Row objects, rows are fetched by chunks
+        of size. Used for big results to keep memory flat.
+        '''
+        self._connect()
+        cursor = self._connection.cursor()
+        cursor.row_factory = Row
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(size)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cursor.close()
+
+    def execute_many(self, query, values):
+        '''
+        Execute query with placeholders for each row of values.
+        Not committed, used for bulk inserts in one transaction.
+        '''
+        self._connect()
+        cursor = self._connection.cursor()
+        cursor.executemany(query, values)
+        cursor.close()
+
     def select_model(self, Model, where = None, order = None, sort_ = None,
-        limit = None):
+        limit = None, params = ()):
         '''
-        Request item from database
+        Request item from database. Where could have placeholders
+        for params.
         '''
         where = '' if not where else " ".join(["WHERE", where])
         order = '' if not order else " ".join(["ORDER BY", order])
         sort_ = '' if not sort_ else sort_.upper()
         limit = '' if not limit else " ".join(["LIMIT", str(limit)])
 
-        query = " ".join(["SELECT * FROM", Model.__tablename__,
+        query = " ".join([self._template("select", Model),
             where, order, sort_, limit, ";"])
-        header, result = self._transaction(query)
+        header, result = self._transaction(query, params)
         if result:
             return self._result_parser(header, result, Model=Model)
         else:
             return None
 
-    def _get_unique_key(self, item):
+    def _model_columns(self, Model):
+        '''
+        Return Model table columns, cached per class
+        '''
+        columns = self._columns.get(Model)
+        if columns is None:
+            d = Model.__dict__
+            # Skip table constraints like UNIQUE
+            columns = frozenset(key for key in d
+                if self._key_accepted(d, key) and not key.isupper())
+            self._columns[Model] = columns
+        return columns
+
+    def _template(self, kind, Model, keys = ()):
         '''
-        Return unique key and value based on item class.
-        Called from delete, update
+        Return query template with placeholders for Model and keys,
+        cached per class and keys
         '''
-        Model = item.__class__
+        template = self._templates.get((kind, Model, keys))
+        if template:
+            return template
+        table = Model.__tablename__
         unique_key = Model.__primary_key__ or Model.__unique_key__
-        unique_value = getattr(item, unique_key)
-        return [unique_key, str(unique_value)]
-
-    def _quote_value(self, Model, key, value):
-        '''
-        Quote value for query if table column values must be quoted
-        '''
-        td_key = getattr(Model, key)
-        if type(value) is int: # Go first because 'not' catch zero
-            return str(value)
-        if type(value) is bool:
-            val = 1 if value else 0
-        elif not value:
-            val = "null"
-        elif any(x in td_key.lower() for x in ["char", "time", "text"]):
-            value = str(value).replace("'", "''")
-            val = "".join(["'", value, "'"])
-        else:
-            val = str(value)
-        return val
+        if kind == "select":
+            d = Model.__dict__
+            columns = [key for key in d if key in self._model_columns(Model)]
+            template = " ".join(["SELECT", ", ".join(columns), "FROM", table])
+        elif kind == "insert":
+            template = " ".join(["INSERT INTO", table, "(", ", ".join(keys),
+                ") VALUES (", ", ".join(["?"] * len(keys)), ");"])
+        elif kind == "update":
+            template = " ".join(["UPDATE", table, "SET",
+                ", ".join([" ".join([key, "= ?"]) for key in keys]),
+                "WHERE", unique_key, "= ?;"])
+        elif kind == "delete":
+            template = " ".join(["DELETE FROM", table, "WHERE", unique_key,
+                "= ?;"])
+        self._templates[(kind, Model, keys)] = template
+        return template
+
+    @staticmethod
+    def _param_value(value):
+        '''
+        Convert value for query parameter. Empty values stored as null.
+        '''
+        if isinstance(value, (int, float)): # Go first because 'not' catch zero
+            return value
+        if not value:
+            return None
+        return value if isinstance(value, (str, bytes)) else str(value)
 
     def insert_model(self, item):
         '''
         Insert data to table in database based on item Model
         '''
         Model = item.__class__
-        keylist = []
-        valuelist = []
-
+        columns = self._model_columns(Model)
         d = item.__dict__
-        keylist = ", ".join([key for key in d if self._key_accepted(d, key)])
-        valuelist = ", ".join([self._quote_value(Model, key, d[key])
-            for key in d if self._key_accepted(d, key)])
-
-        query = " ".join(["INSERT INTO", Model.__tablename__,
-                "(", keylist, ") VALUES (", valuelist, ");"])
-        self._transaction(query)
+        keys = tuple(key for key in d if key in columns)
+        self._transaction(self._template("insert", Model, keys),
+            [self._param_value(d[key]) for key in keys])
 
     def delete_model(self, item):
         '''
         Delete item based on item Model
         '''
         Model = item.__class__
-        unique_key, unique_value = self._get_unique_key(item)
-        query = " ".join(["DELETE FROM", Model.__tablename__,
-            "WHERE", unique_key, "=", unique_value,";"])
-        self._transaction(query)
+        unique_value = getattr(item,
+            Model.__primary_key__ or Model.__unique_key__)
+        self._transaction(self._template("delete", Model), (unique_value,))
 
     def update_model(self, item, **kwargs):
         '''
         Update item based on item Model
         '''
         Model = item.__class__
-        unique_key, unique_value = self._get_unique_key(item)
-        update_list = ", ".join(
-                [" ".join([key, "=", self._quote_value(Model, key, kwargs[key])])
-                for key in kwargs]
-            )
-        query = " ".join(["UPDATE", Model.__tablename__, "SET", update_list,
-                "WHERE", unique_key, "=", unique_value, ";"])
-        self._transaction(query)
+        unique_value = getattr(item,
+            Model.__primary_key__ or Model.__unique_key__)
+        keys = tuple(kwargs)
+        self._transaction(self._template("update", Model, keys),
+            [*(self._param_value(kwargs[key]) for key in keys), unique_value])
+
+    def update_models(self, items, **kwargs):
+        '''
+        Update items of one Model with same values. Not committed,
+        one query per chunk of items.
+        '''
+        if not items:
+            return
+        Model = items[0].__class__
+        unique_key = Model.__primary_key__ or Model.__unique_key__
+        keys = tuple(kwargs)
+        values = [self._param_value(kwargs[key]) for key in keys]
+        chunk = self._max_params - len(keys)
+        for idx in range(0, len(items), chunk):
+            part = [getattr(x, unique_key) for x in items[idx:idx + chunk]]
+            self._transaction(" ".join(["UPDATE", Model.__tablename__,
+                "SET", ", ".join([" ".join([key, "= ?"]) for key in keys]),
+                "WHERE", unique_key, "IN (", ", ".join(["?"] * len(part)),
+                ");"]), [*values, *part])
+
+    def delete_models(self, items):
+        '''
+        Delete items of one Model. Not committed, one query per chunk
+        of items.
+        '''
+        if not items:
+            return
+        Model = items[0].__class__
+        unique_key = Model.__primary_key__ or Model.__unique_key__
+        for idx in range(0, len(items), self._max_params):
+            part = [getattr(x, unique_key)
+                for x in items[idx:idx + self._max_params]]
+            self._transaction(" ".join(["DELETE FROM", Model.__tablename__,
+                "WHERE", unique_key, "IN (", ", ".join(["?"] * len(part)),
+                ");"]), part)
@@ -0,0 +1,129 @@
+'''
+Get metadata from EPUB and FB2 books without full document load.
+'''
+import io
+import posixpath
+from base64 import b64decode
+from datetime import date
+from urllib.parse import unquote
+from xml.etree.ElementTree import iterparse, fromstring
+from zipfile import ZipFile
+
+
+def get_xml_meta(file, filetype: str) -> [tuple, None]:
+    '''
+    Get title, authors, date and cover image bytes from epub or fb2.
+    File could be path or bytes of book file.
+    Return None if metadata can't be read.
+    '''
+    file = io.BytesIO(file) if isinstance(file, bytes) else file
+    try:
+        if filetype == "epub":
+            return get_epub_meta(file)
+        if filetype == "fb2":
+            return get_fb2_meta(file)
+    except Exception:
+        return None
+    return None
+
+def get_epub_meta(file) -> tuple:
+    '''
+    Read OPF package file of epub for metadata and cover image.
+    '''
+    with ZipFile(file) as zip_file:
+        container = fromstring(zip_file.read("META-INF/container.xml"))
+        opf_path = next(x.get("full-path") for x in container.iter()
+            if _local(x.tag) == "rootfile")
+        opf = fromstring(zip_file.read(opf_path))
+
+        title = cover_id = date_ = None
+        authors, items = [], {}
+        for elem in opf.iter():
+            tag = _local(elem.tag)
+            text = elem.text.strip() if elem.text else ""
+            if tag == "title" and not title:
+                title = text
+            elif tag == "creator" and text:
+                role = next((v for k, v in elem.attrib.items()
+                    if _local(k) == "role"), "aut")
+                if role == "aut":
+                    authors.append(_split_name(text))
+            elif tag == "date" and not date_:
+                date_ = _parse_date(text)
+            elif tag == "meta" and elem.get("name") == "cover":
+                cover_id = elem.get("content")
+            elif tag == "item":
+                items[elem.get("id")] = elem
+                if "cover-image" in elem.get("properties", ""):
+                    cover_id = cover_id if cover_id else elem.get("id")
+
+        cover = None
+        if cover_id in items:
+            href = unquote(items[cover_id].get("href"))
+            cover = zip_file.read(posixpath.normpath(
+                posixpath.join(posixpath.dirname(opf_path), href)))
+    return (title, authors, date_, cover)
+
+def get_fb2_meta(file) -> tuple:
+    '''
+    Parse fb2 stream for title-info in description and cover binary.
+    Elements are cleared while parsing, book body is not kept in memory.
+    '''
+    title = cover_id = date_ = cover = None
+    authors = []
+    in_title_info = False
+    for event, elem in iterparse(file, events=("start", "end")):
+        tag = _local(elem.tag)
+        if event == "start":
+            if tag == "title-info":
+                in_title_info = True
+            continue
+        if tag == "title-info":
+            in_title_info = False
+        elif in_title_info and tag == "book-title":
+            title = elem.text.strip() if elem.text else None
+        elif in_title_info and tag == "author":
+            names = {_local(x.tag): x.text.strip() for x in elem if x.text}
+            if names.get("first-name") or names.get("last-name"):
+                authors.append([names.get("first-name", "Unknown"),
+                    names.get("last-name", "Unknown")])
+        elif in_title_info and tag == "date":
+            date_ = _parse_date(elem.get("value") or elem.text or "")
+        elif in_title_info and tag == "image" and not cover_id:
+            cover_id = next((v.lstrip("#") for k, v in elem.attrib.items()
+                if _local(k) == "href"), None)
+        elif tag == "description" and not cover_id:
+            break
+        elif tag == "binary" and elem.get("id") == cover_id:
+            cover = b64decode(elem.text) if elem.text else None
+            break
+        if tag in ("section", "binary", "description"):
+            elem.clear()
+    return (title, authors, date_, cover)
+
+def _local(tag: str) -> str:
+    '''
+    Return tag or attribute name without namespace.
+    '''
+    return tag.rsplit("}", 1)[-1]
+
+def _split_name(name: str) -> list:
+    '''
+    Split full name to [first name, last name].
+    '''
+    names = name.rsplit(" ", 1)
+    return names if len(names) == 2 else [name, "Unknown"]
+
+def _parse_date(value: str) -> [object, None]:
+    '''
+    Return date from ISO date or year string.
+    '''
+    value = value.strip()
+    try:
+        if len(value) >= 10:
+            return date.fromisoformat(value[:10])
+        if len(value) == 4:
+            return date(int(value), 1, 1)
+    except ValueError:
+        pass
+    return None
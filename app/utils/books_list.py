@@ -0,0 +1,95 @@
+'''
+Books list fetched from database by pages on demand.
+'''
+from collections import OrderedDict
+
+from app import config
+
+
+class BooksList():
+    '''
+    Read only sequence of books rows for search value. Only total count
+    is requested at creation, rows are fetched by windows when indexed.
+    Next window is requested by keyset of previous one if it is known,
+    else by offset. Limited number of windows is kept in memory.
+    '''
+    def __init__(self, db_funcs: object, search: tuple = None,
+        tag_search: bool = False, order: tuple = None):
+        self._db_funcs = db_funcs
+        self._search, self._tag_search = search, tag_search
+        self._order = order # (column, direction), None - query order
+        self._size = config.books_page_size
+        self._pages = OrderedDict() # {page number: rows}
+        self._keys = {} # {page number: keyset of page last row}
+        self._rows = None # all rows for search without windows
+        if search and search[1] == "duplicates":
+            self._rows = db_funcs.books_duplicates(search[0]) or []
+            self._sort_rows()
+            self._len = len(self._rows)
+        else:
+            self._len = db_funcs.count_books(search, tag_search)
+
+        # Public methods: sort
+
+    def __len__(self):
+        return self._len
+
+    def __bool__(self):
+        return self._len > 0
+
+    def __iter__(self):
+        for idx in range(self._len):
+            yield self[idx]
+
+    def __getitem__(self, idx: [int, slice]):
+        if isinstance(idx, slice):
+            return [self[x] for x in range(*idx.indices(self._len))]
+        if idx < 0:
+            idx += self._len
+        if not 0 <= idx < self._len:
+            raise IndexError("books list index out of range")
+        if self._rows is not None:
+            return self._rows[idx]
+        page, pos = divmod(idx, self._size)
+        rows = self._get_page(page)
+        if pos >= len(rows):
+            # Library changed after count, keep length of list
+            raise IndexError("books list index out of range")
+        return rows[pos]
+
+    def sort(self, order: tuple) -> None:
+        '''
+        Set books order (column, direction), clear fetched pages.
+        '''
+        self._order = order
+        self._pages.clear()
+        self._keys.clear()
+        if self._rows is not None:
+            self._sort_rows()
+
+    def _sort_rows(self) -> None:
+        '''
+        Sort rows of list without windows.
+        '''
+        if not self._order:
+            return
+        db_column, direction = self._order
+        self._rows.sort(reverse=direction,
+            key=lambda x: x[db_column] if not x[db_column] is None else "")
+
+    def _get_page(self, page: int) -> list:
+        '''
+        Return rows of page from cache or database.
+        '''
+        if page in self._pages:
+            self._pages.move_to_end(page)
+            return self._pages[page]
+        rows, key = self._db_funcs.get_books_page(self._search,
+            self._tag_search, sort=self._order, after=self._keys.get(page - 1),
+            offset=page * self._size, limit=self._size)
+        if key:
+            self._keys[page] = key
+        self._pages[page] = rows
+        if len(self._pages) > config.books_pages_cache:
+            self._pages.popitem(last=False)
+        return rows
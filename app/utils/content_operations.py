@@ -0,0 +1,68 @@
+'''
+Books content indexing operations.
+'''
+import os
+
+from app import config, state
+from app.modules.mupdf import get_pages_text
+from app.modules.sqlite import Db
+from app.utils.db_operations import DbaseInterface
+from app.utils.job_runner import WorkerPool
+
+_batch_text_max = 32 * 1024 * 1024 # text chars of batch kept in memory
+
+
+def index_content(job: object) -> None:
+    '''
+    Job. Add text of not indexed books to content index page by page.
+    Text is extracted by worker processes, books are written by batches
+    with their indexed state, so cancelled or interrupted indexing
+    continues from not indexed books at next run. Books without text
+    are marked, books which file can't be read are not.
+    '''
+    dbase = Db(state.dbase.db_file, state.dbase.pragmas)
+    db_funcs = DbaseInterface(dbase)
+    try:
+        books = db_funcs.get_books_to_index()
+        if not books:
+            return
+        lib_books = state.app_settings["lib_books"]
+        items = [(x["book_id"], os.path.join(lib_books, x["file"]))
+            for x in books]
+        items_len, batch, batch_text = len(items), [], 0
+        with WorkerPool(items_len) as pool:
+            for idx, (item, result) in enumerate(
+                pool.map(get_book_pages, items, job)):
+                if not job.wait():
+                    break
+                job.progress(idx, items_len)
+                if not result:
+                    # Book is left not indexed and retried at next run
+                    job.error(item[1], "Unable to read book text")
+                    continue
+                batch.append((item[0], *result))
+                batch_text += sum(len(x[1]) for x in result[1])
+                if (len(batch) >= config.import_batch_size
+                    or batch_text >= _batch_text_max):
+                    _write_batch(job, db_funcs, batch)
+                    batch, batch_text = [], 0
+            # Extracted books are written on cancel too
+            _write_batch(job, db_funcs, batch)
+    finally:
+        dbase.close_connection()
+
+def _write_batch(job: object, db_funcs: object, batch: list) -> None:
+    '''
+    Add batch of books pages to content index.
+    '''
+    if not batch:
+        return
+    db_funcs.add_books_content(batch)
+    if not db_funcs.success:
+        job.error(None, "Unable to add books text to database")
+
+def get_book_pages(item: tuple) -> [tuple, None]:
+    '''
+    Worker. Get pages text of book, item - (book id, book file path).
+    '''
+    return get_pages_text(item[1])
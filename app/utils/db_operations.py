@@ -2,19 +2,27 @@
 Database operations interface
 '''
 import datetime as dt
+import os
+from collections import OrderedDict
 
-from app import state
-from app.models import Book, Author, Authorship, Category, Series
+from app import config, state
+from app.models import (Book, Author, Authorship, Category, Series,
+    BookSearch, BookContent, BookSort)
+from app.modules.near_duplicates import find_near_duplicates
 
 
 class DbaseInterface():
     '''
     Class for database interface
     '''
-    def __init__(self):
-        self._db = state.dbase
+    def __init__(self, dbase: object = None):
+        # Own database object for background jobs, connection is per thread
+        self._db = dbase if dbase else state.dbase
         self._tag_classes = {"category": Category, "series": Series}
         self._success = False # Public for checking successful transaction
+        # Identity map {(Model, id): object}, authorships lists of book
+        # stored by (Authorship, book id)
+        self._cache = OrderedDict()
 
     @property
     def success(self) -> bool:
@@ -25,21 +33,90 @@ class DbaseInterface():
         self._success = False
         return status
 
+    ###              ###
+    ### Identity map ###
+    ###              ###
+
+    def _cached(self, Model: type, id_: int) -> [object, None]:
+        '''
+        Return cached object of Model by id or None.
+        '''
+        item = self._cache.get((Model, id_))
+        if item is not None:
+            self._cache.move_to_end((Model, id_))
+        return item
+
+    def _cache_put(self, item: object, key: tuple = None) -> object:
+        '''
+        Store object in cache, least recently used are evicted.
+        Return cached object of same row refreshed by item values.
+        '''
+        key = key if key else (item.__class__, item.dbid)
+        cached = self._cache.get(key)
+        if cached is not None and not isinstance(item, list):
+            cached.__dict__.update(item.__dict__)
+            item = cached
+        self._cache[key] = item
+        self._cache.move_to_end(key)
+        while len(self._cache) > config.db_cache_size:
+            self._cache.popitem(last=False)
+        return item
+
+    def _uncache(self, Model: type, id_: int = None) -> None:
+        '''
+        Remove cached object of Model by id or all objects of Model.
+        '''
+        if id_ is not None:
+            self._cache.pop((Model, id_), None)
+            return
+        for key in [x for x in self._cache if x[0] is Model]:
+            del self._cache[key]
+
+    def _refresh(self, Model: type, ids: list = None) -> None:
+        '''
+        Reload cached objects of Model by ids or all from database.
+        Objects are refreshed in place with derived attributes, objects
+        of deleted rows are removed from cache.
+        '''
+        ids = set(ids) if ids is not None else None
+        cached = [x[1] for x in self._cache
+            if x[0] is Model and (ids is None or x[1] in ids)]
+        chunk = self._db.max_params
+        for idx in range(0, len(cached), chunk):
+            part = cached[idx:idx + chunk]
+            where = ''.join([Model.__primary_key__, " IN (",
+                ", ".join(["?"] * len(part)), ")"])
+            items = self._db.select_model(Model, where=where,
+                params=part) or []
+            for item in items:
+                self._cache_put(item)
+            found = {x.dbid for x in items}
+            for id_ in part:
+                if id_ not in found:
+                    self._uncache(Model, id_)
+
+    def refresh_cache(self) -> None:
+        '''
+        Reload cached books changed by other connection, called after
+        background jobs.
+        '''
+        self._refresh(Book)
+
     ###              ###
     ### Book queries ###
     ###              ###
 
-    def main_query(self, where: str = None, having: str = None) -> str:
+    def main_query(self, where: str = None, join: str = None,
+        order: str = None, columns: str = None, limit: str = None) -> str:
         '''
-        Create main query for books request
+        Create main query for books request. Authors names are read
+        from books column, so query has no authors joins and grouping.
         '''
-        query = " ".join([
+        query = " ".join(x for x in [
             "SELECT",
                 "books.book_id,",
                 "books.title,",
-                "group_concat(authors.last_name || '",
-                    "' || authors.first_name, ', ')",
-                    "AS authors,",
+                "books.authors_display AS authors,",
                 "category_name AS category,",
                 "books.bookmark,",
                 "books.read_state,",
@@ -52,74 +129,256 @@ class DbaseInterface():
                 "books.cover,",
                 "books.file,",
                 "books.pages",
+                columns,
             "FROM books",
-            "LEFT JOIN authorships ON authorships.book_id = books.book_id",
-            "LEFT JOIN authors ON authorships.author_id = authors.author_id",
             "LEFT JOIN categories ON books.category = categories.category_id",
             "LEFT JOIN series ON books.series = series.series_id",
+            join,
             where,
-            "GROUP BY books.book_id",
-            having,
-            "ORDER BY books.time_created DESC;",
-        ])
+            "ORDER BY", order if order else "books.time_created DESC",
+            limit, ";",
+        ] if x)
         return query
 
-    def get_books(self, search: [None, tuple] = None,
-        tag_search: bool = False) -> [list, None]:
+    def _books_filter(self, search: [None, tuple],
+        tag_search: bool) -> [tuple, None]:
         '''
-        Main query to get books by search value or all
+        Return parts of books query for search value:
+        (where, join, columns, order by relevance, named params).
+        Search words are matched any or all if match_all set.
+        None if search value has nothing to search.
         '''
-        # Get values for books query
-        val, val_type = search if search else (None, None)
-
-        # Get books
-        where = having = ""
-        if val_type == "duplicates":
-            return self.books_duplicates()
-        elif val_type == "bookmark":
+        val, val_type, match_all = (*search, False)[:3] if search else (
+            None, None, False)
+        where = join = columns = order = ""
+        params = {}
+        if val_type == "bookmark":
             where = ''.join(["WHERE books.", val_type, " = 1"])
         elif tag_search:
-            where = (''.join(["WHERE books.", val_type, " = ", str(val)])
-                if val else "")
-        elif val_type == "authors":
-            having = "".join([
-                "HAVING authors.last_name LIKE '%",
-                str(val), "%'"])
+            if val:
+                where = ''.join(["WHERE books.", val_type, " = :tag"])
+                params = {"tag": val}
+        elif val_type == "content":
+            # Books by pages text, hits - numbers of found pages
+            match = self._search_match(str(val), "all", match_all)
+            if not match:
+                return None
+            bits = str(BookContent.page_bits)
+            join = " ".join(["JOIN (SELECT rowid >>", bits, "AS book_id,",
+                "min(rank) AS rank, group_concat(rowid & ",
+                str(BookContent.max_page), ", ', ') AS hits",
+                "FROM books_content WHERE books_content MATCH :match",
+                "GROUP BY rowid >>", bits, ") AS fts",
+                "ON fts.book_id = books.book_id"])
+            order, columns, params = "fts.rank", ", fts.hits", {"match": match}
+        elif val_type in self.search_columns:
+            # Full-text search ordered by relevance
+            match = self._search_match(str(val), val_type, match_all)
+            if not match:
+                return None
+            join = " ".join(["JOIN (SELECT rowid, rank FROM books_fts",
+                "WHERE books_fts MATCH :match) AS fts",
+                "ON fts.rowid = books.book_id"])
+            order, params = "fts.rank", {"match": match}
         elif val_type:
-            where = ''.join(
-                ["WHERE lower(books.", val_type, ") LIKE '%",
-                str(val), "%'" ])
+            # Books with words, more matched words first
+            words = str(val).split()
+            if not words:
+                return None
+            conds = [''.join(["(lower(books.", val_type, ") LIKE :w",
+                str(idx), ")"]) for idx in range(len(words))]
+            where = ''.join(["WHERE (",
+                (" AND " if match_all else " OR ").join(conds), ")"])
+            if len(words) > 1 and not match_all:
+                order = ''.join([" + ".join(conds), " DESC"])
+            params = {''.join(["w", str(idx)]): ''.join(["%", x, "%"])
+                for idx, x in enumerate(words)}
+        return (where, join, columns, order, params)
 
-        books = self._db.execute(self.main_query(where, having))
+    def get_books(self, search: [None, tuple] = None,
+        tag_search: bool = False) -> [list, None]:
+        '''
+        Main query to get books by search value or all
+        '''
+        if search and search[1] == "duplicates":
+            return self.books_duplicates(search[0])
+        parts = self._books_filter(search, tag_search)
+        if not parts:
+            return None
+        where, join, columns, order, params = parts
+        books = self._db.execute(
+            self.main_query(where, join, order, columns),
+            params=params, compact=True)
         if books:
             return books
         return None
 
-    def get_book(self, title: str = None, id_: int = None) -> [dict, None]:
+    def get_books_page(self, search: [None, tuple] = None,
+        tag_search: bool = False, sort: tuple = None, after: tuple = None,
+        offset: int = 0, limit: int = 100) -> tuple:
+        '''
+        Get window of books by search value or all.
+        Sort - (column, direction), default order by relevance for
+        full-text search or by time created. Next window starts after
+        key of previous window (keyset) if given, else at offset.
+        Return (books, key for next window or None if not sorted).
+        '''
+        parts = self._books_filter(search, tag_search)
+        if not parts:
+            return ([], None)
+        where, join, columns, order, params = parts
+        order = order if order else "books.time_created DESC"
+        if sort:
+            key = self._sort_key(sort[0])
+            desc = " DESC" if sort[1] else ""
+            order = ''.join([key, desc, ", books.book_id", desc])
+            columns = ''.join([columns, ", ", key, " AS sort_key"])
+        if sort and after:
+            cond = ''.join(["(", key, ", books.book_id) ",
+                "<" if sort[1] else ">", " (:after_key, :after_id)"])
+            where = (" AND ".join([where, cond]) if where
+                else " ".join(["WHERE", cond]))
+            params = {**params, "after_key": after[0], "after_id": after[1]}
+            offset = 0
+        limit = " ".join(["LIMIT", str(int(limit)), "OFFSET",
+            str(int(offset))])
+        books = self._db.execute(
+            self.main_query(where, join, order, columns, limit),
+            params=params, compact=True)
+        if not books:
+            return ([], None)
+        last = books[-1]
+        next_key = (last["sort_key"], last["book_id"]) if sort else None
+        return (books, next_key)
+
+    def iter_books(self, search: [None, tuple] = None,
+        tag_search: bool = False) -> iter:
+        '''
+        Iterate books by search value or all, rows are read by chunks
+        '''
+        parts = self._books_filter(search, tag_search)
+        if not parts:
+            return iter(())
+        where, join, columns, order, params = parts
+        return self._db.iter_query(
+            self.main_query(where, join, order, columns), params=params)
+
+    def count_books(self, search: [None, tuple] = None,
+        tag_search: bool = False) -> int:
+        '''
+        Get number of books by search value or all
+        '''
+        if search and search[1] == "duplicates":
+            books = self.books_duplicates(search[0])
+            return len(books) if books else 0
+        parts = self._books_filter(search, tag_search)
+        if not parts:
+            return 0
+        where, join, _, _, params = parts
+        result = self._db.execute(" ".join(["SELECT count(*) AS total",
+            "FROM books", join, where, ";"]), params=params)
+        return result[0]["total"]
+
+    @staticmethod
+    def _sort_key(column: str) -> str:
+        '''
+        Return sort expression for books column. Title and authors
+        sorted by indexed sort keys, tags by names.
+        '''
+        if column in BookSort.__columns__:
+            return ''.join(["books.", BookSort.__columns__[column]])
+        if column in ("category", "series"):
+            return ''.join(["ifnull(", column, "_name, '')"])
+        if column in ("book_id", "time_created"):
+            return ''.join(["books.", column])
+        return ''.join(["ifnull(books.", column, ", '')"])
+
+    @property
+    def search_columns(self) -> tuple:
+        '''
+        Return search types using full-text index, "all" - all columns,
+        "content" - books pages text.
+        '''
+        return (*BookSearch.__columns__, "all", "content")
+
+    def search_ranked(self, search: [None, tuple]) -> bool:
+        '''
+        Return True if books found by search value are ordered by
+        relevance. Duplicates are ordered by clusters.
         '''
-        Get book by title or id
+        if search and search[1] == "duplicates":
+            return True
+        parts = self._books_filter(search, False) if search else None
+        return bool(parts and parts[3])
+
+    @staticmethod
+    def _search_match(value: str, column: str,
+        match_all: bool = False) -> str:
         '''
+        Create full-text query for search value in column.
+        Each word is matched as prefix, books with more words are ranked
+        higher. Books should have all words if match_all set.
+        '''
+        words = [''.join(['"', x.replace('"', '""'), '"*'])
+            for x in value.split() if any(c.isalnum() for c in x)]
+        if not words:
+            return ""
+        match = ''.join(["(", (" AND " if match_all else " OR ").join(words),
+            ")"])
+        return match if column == "all" else " : ".join([column, match])
+
+    def get_book(self, title: str = None, id_: int = None,
+        file_hash: str = None) -> [dict, None]:
+        '''
+        Get book by title, id or file content hash
+        '''
+        if id_ and self._cached(Book, id_):
+            return self._cached(Book, id_)
         if id_:
-            where = ''.join(["book_id = ", str(id_)])
+            where, params = "book_id = ?", (id_,)
+        elif file_hash:
+            where, params = "file_hash = ?", (file_hash,)
         else:
-            where = ''.join(["title = ", "'", str(title), "'"])
-        book = self._db.select_model(Book, where=where)
+            where, params = "title = ?", (title,)
+        book = self._db.select_model(Book, where=where, params=params)
         if book:
-            return book[0]
+            return self._cache_put(book[0])
         return None
 
+    def get_books_by_ids(self, ids: list) -> list:
+        '''
+        Get books by ids in order of ids, cached books are not requested.
+        One query per chunk of ids within SQLite variables limit.
+        '''
+        books = {x: self._cached(Book, x) for x in ids}
+        missing = [x for x in ids if books[x] is None]
+        chunk = self._db.max_params
+        for idx in range(0, len(missing), chunk):
+            part = missing[idx:idx + chunk]
+            where = ''.join(["book_id IN (", ", ".join(["?"] * len(part)),
+                ")"])
+            for book in self._db.select_model(Book, where=where,
+                params=part) or []:
+                books[book.book_id] = self._cache_put(book)
+        return [books[x] for x in ids if books[x] is not None]
+
     def add_book(self, file_data_object) -> None:
         '''
         Add multiple books
         '''
         self._success = False
         bf = file_data_object
+        # Skip book if same file content exists in library
+        if bf.duplicate or (bf.file_hash
+            and self.get_book(file_hash=bf.file_hash)):
+            bf.duplicate = True
+            return
         # Add book to database
         time_created = str(dt.datetime.now(dt.timezone.utc))
         try:
             book = Book(title=bf.title, pages=bf.pages, pub_date=bf.pub_date,
                 file=bf.book_file_name, cover=bf.cover_file_name,
-                category=1, time_created=time_created)
+                file_hash=bf.file_hash, category=1, time_created=time_created)
             self._db.insert_model(book)
         except Exception as err:
             self._db.rollback()
@@ -143,6 +402,136 @@ class DbaseInterface():
         self._db.commit()
         self._success = True
 
+    def add_books(self, book_files: list, authors_ids: dict) -> None:
+        '''
+        Add multiple books in one transaction.
+        Authors are resolved with authors_ids map from get_authors_ids,
+        new authors are added to map. Books with file content existing in
+        library are marked as duplicates, added books get book_id and
+        their import journal items set to inserted stage.
+        '''
+        self._success = False
+        hashes = [bf.file_hash for bf in book_files if bf.file_hash]
+        placeholders = ", ".join(["?"] * len(hashes))
+        result = self._db.execute(''.join(["SELECT file_hash FROM books ",
+            "WHERE file_hash IN (", placeholders, ");"]),
+            params=hashes) if hashes else None
+        known_hashes = {x["file_hash"] for x in result} if result else set()
+        books = []
+        for bf in book_files:
+            if bf.duplicate or bf.file_hash in known_hashes:
+                bf.duplicate = True
+                continue
+            if bf.file_hash:
+                known_hashes.add(bf.file_hash)
+            books.append(bf)
+        if not books:
+            self._success = True
+            return
+
+        try:
+            last_book_id = self._get_max_id("books", "book_id")
+            self._db.execute_many(" ".join([
+                "INSERT INTO books (title, pages, pub_date, file, cover,",
+                "file_hash, category, time_created)",
+                "VALUES (?, ?, ?, ?, ?, ?, 1, ?);"]),
+                [(bf.title, bf.pages, str(bf.pub_date) if bf.pub_date else None,
+                bf.book_file_name, bf.cover_file_name, bf.file_hash,
+                str(dt.datetime.now(dt.timezone.utc))) for bf in books])
+            # Library file names are unique, map them to new ids
+            result = self._db.execute(
+                "SELECT book_id, file FROM books WHERE book_id > ?;",
+                params=(last_book_id,))
+            books_ids = {x["file"]: x["book_id"] for x in result}
+
+            names = {tuple(x) for bf in books for x in bf.authors
+                if tuple(x) not in authors_ids}
+            if names:
+                self._add_authors_ids(names, authors_ids)
+            self._db.execute_many(" ".join([
+                "INSERT OR IGNORE INTO authorships (book_id, author_id)",
+                "VALUES (?, ?);"]),
+                {(books_ids[bf.book_file_name], authors_ids[tuple(x)])
+                for bf in books for x in bf.authors})
+            # Journal stage changed in the same transaction as books rows
+            self._set_import_stage(
+                [bf.journal_id for bf in books if bf.journal_id], "inserted")
+            self._db.commit()
+        except Exception:
+            self._db.rollback()
+            return
+        for bf in books:
+            bf.book_id = books_ids[bf.book_file_name]
+        self._success = True
+
+    def _add_authors_ids(self, names: set, authors_ids: dict) -> None:
+        '''
+        Insert authors for bulk import and add their ids to map.
+        Names - set of (first name, last name). Not committed.
+        '''
+        last_author_id = self._get_max_id("authors", "author_id")
+        self._db.execute_many(" ".join([
+            "INSERT OR IGNORE INTO authors (first_name, last_name)",
+            "VALUES (?, ?);"]), names)
+        result = self._db.execute(" ".join([
+            "SELECT author_id, first_name, last_name FROM authors",
+            "WHERE author_id > ?;"]), params=(last_author_id,))
+        for x in result if result else []:
+            authors_ids[(x["first_name"], x["last_name"])] = x["author_id"]
+        # Authors added after map was loaded
+        missing = [x for x in names if x not in authors_ids]
+        for first_name, last_name in missing:
+            author = self.get_author(first_name=first_name,
+                last_name=last_name)
+            authors_ids[(first_name, last_name)] = author.dbid
+
+    def _get_max_id(self, table: str, id_column: str) -> int:
+        '''
+        Get max id in table, 0 for empty table
+        '''
+        result = self._db.execute(''.join(["SELECT max(", id_column,
+            ") AS max_id FROM ", table, ";"]))
+        return result[0]["max_id"] or 0
+
+    def get_books_to_index(self) -> [list, None]:
+        '''
+        Get books which content is not indexed yet
+        '''
+        result = self._db.execute(
+            "SELECT book_id, file FROM books WHERE content_indexed = 0;")
+        if result:
+            return result
+        return None
+
+    def add_books_content(self, books_pages: list) -> None:
+        '''
+        Add pages text of books to content index in one transaction.
+        Books pages - list of (book id, pages count,
+        [(page number, text),...]). Pages count set for books without it.
+        '''
+        self._success = False
+        bits, max_page = BookContent.page_bits, BookContent.max_page
+        try:
+            for book_id, pages_count, pages in books_pages:
+                pages = [x for x in pages if x[0] <= max_page]
+                # Remove pages left by previous indexing of book
+                self._db.execute(" ".join(["DELETE FROM books_content",
+                    "WHERE rowid BETWEEN ? AND ?;"]),
+                    params=(book_id << bits, (book_id << bits) + max_page))
+                self._db.execute_many(
+                    "INSERT INTO books_content (rowid, text) VALUES (?, ?);",
+                    [((book_id << bits) + page, text) for page, text in pages])
+                self._db.execute(" ".join(["UPDATE books",
+                    "SET content_indexed = ?,",
+                    "pages = CASE WHEN pages > 0 THEN pages ELSE ? END",
+                    "WHERE book_id = ?;"]),
+                    params=(1 if pages else 2, pages_count, book_id))
+            self._db.commit()
+        except Exception:
+            self._db.rollback()
+            return
+        self._success = True
+
     ###             ###
     ### Tag queries ###
     ###             ###
@@ -152,15 +541,18 @@ class DbaseInterface():
         '''
         Get category by title or id
         '''
+        Model = self._tag_classes[tag_type]
+        if id_ and self._cached(Model, id_):
+            return self._cached(Model, id_)
         if id_:
-            where = ''.join([tag_type, "_id = ", str(id_)])
+            where, params = ''.join([tag_type, "_id = ?"]), (id_,)
         elif name_:
-            where = ''.join([tag_type, "_name = ", "'", name_, "'"])
+            where, params = ''.join([tag_type, "_name = ?"]), (name_,)
         else:
-            where = None
-        result = self._db.select_model(self._tag_classes[tag_type], where=where)
+            where, params = None, ()
+        result = self._db.select_model(Model, where=where, params=params)
         if result and where:
-            return result[0]
+            return self._cache_put(result[0])
         else:
             return result
         return None
@@ -184,23 +576,38 @@ class DbaseInterface():
         '''
         Get author by names
         '''
-        pat_suffix = ([" AND ", "patronymic = ", "'", str(patronymic), "'"]
-            if patronymic else "")
         if first_name and last_name:
-            where = ''.join([
-                    "first_name = ", "'", str(first_name), "'", " AND ",
-                    "last_name = ", "'", str(last_name), "'", *pat_suffix])
+            where = "first_name = ? AND last_name = ?"
+            params = (first_name, last_name)
+            if patronymic:
+                where = ''.join([where, " AND patronymic = ?"])
+                params = (*params, patronymic)
+        elif id_ and self._cached(Author, id_):
+            return self._cached(Author, id_)
         elif id_:
-            where=''.join(["author_id = ", str(id_)])
+            where, params = "author_id = ?", (id_,)
 
-        author = self._db.select_model(Author, where=where)
+        author = self._db.select_model(Author, where=where, params=params)
         if author:
-            return author[0]
+            return self._cache_put(author[0])
         return None
 
+    def get_authors_ids(self) -> dict:
+        '''
+        Get all authors ids for bulk import.
+        Return dict {(first name, last name): author id}.
+        '''
+        result = self._db.execute(
+            "SELECT author_id, first_name, last_name FROM authors;")
+        if not result:
+            return {}
+        return {(x["first_name"], x["last_name"]): x["author_id"]
+            for x in result}
+
     def get_authors(self, book_id: int) -> [dict, None]:
         '''
-        Get concatenated authors for book
+        Get concatenated authors for book, names as first and last name.
+        Books lists read books column with last names first.
         '''
         authors = self._db.execute(" ".join([
             "SELECT",
@@ -210,8 +617,8 @@ class DbaseInterface():
             "FROM books",
             "LEFT JOIN authorships ON authorships.book_id = books.book_id",
             "LEFT JOIN authors ON authorships.author_id = authors.author_id",
-            "WHERE books.book_id =", str(book_id), ";"
-        ]))
+            "WHERE books.book_id = ?;"
+        ]), params=(book_id,))
         if authors:
             return authors[0]["authors"]
         return None
@@ -220,8 +627,8 @@ class DbaseInterface():
         '''
         Get names of authors
         '''
-        result = self._db.select_model(Author, where=''.join([
-                "last_name LIKE '%", str(val), "%'"]), limit=20)
+        result = self._db.select_model(Author, where="last_name LIKE ?",
+            limit=20, params=(''.join(["%", str(val), "%"]),))
         if result:
             return result
         return None
@@ -242,11 +649,14 @@ class DbaseInterface():
         '''
         Get all authorships for book
         '''
+        authorships = self._cached(Authorship, book_id)
+        if authorships:
+            return authorships
         authorships = self._db.select_model(
-            Authorship, where=''.join(["book_id = ", str(book_id)])
+            Authorship, where="book_id = ?", params=(book_id,)
         )
         if authorships:
-            return authorships
+            return self._cache_put(authorships, (Authorship, book_id))
         return None
 
     def add_authorship(self, book_id: int, author_id: int) -> None:
@@ -256,6 +666,113 @@ class DbaseInterface():
         self._db.insert_model(Authorship(book_id=book_id,
                 author_id=author_id))
         self._db.commit()
+        self._uncache(Authorship, book_id)
+        # Authors columns of book are rewritten by triggers
+        self._refresh(Book, [book_id])
+
+    ###                        ###
+    ### Import journal queries ###
+    ###                        ###
+
+    def add_import_items(self, items: list, scanned: dict = None,
+        stage: str = "queued") -> dict:
+        '''
+        Add source items of new import to journal.
+        Items - book file paths or (archive path, book file name),
+        scanned - dict {file path: (size, modification time in ns)}.
+        Return dict {item: journal item id}.
+        '''
+        scanned = scanned if scanned else {}
+        last_item_id = self._get_max_id("import_journal", "item_id")
+        rows = []
+        for item in items:
+            path, member = item if isinstance(item, tuple) else (item, None)
+            size, mtime = scanned.get(path, (None, None))
+            rows.append((path, member, size, mtime, stage))
+        self._db.execute_many(" ".join([
+            "INSERT INTO import_journal (path, member, size, mtime, stage)",
+            "VALUES (?, ?, ?, ?, ?);"]), rows)
+        self._db.commit()
+        return self._get_import_items(
+            "item_id > ?", (last_item_id,)) if rows else {}
+
+    def get_import_queue(self) -> dict:
+        '''
+        Get journal items not imported yet.
+        Return dict {item: journal item id}.
+        '''
+        return self._get_import_items("stage = 'queued'")
+
+    def _get_import_items(self, where: str, params: tuple = ()) -> dict:
+        '''
+        Get journal items by condition as dict {item: journal item id}.
+        '''
+        result = self._db.execute(''.join([
+            "SELECT item_id, path, member FROM import_journal WHERE ",
+            where, ";"]), params=params)
+        return {((x["path"], x["member"]) if x["member"] else x["path"]):
+            x["item_id"] for x in result} if result else {}
+
+    def set_import_parsed(self, book_files: list) -> None:
+        '''
+        Store library names of parsed books before their files written.
+        '''
+        self._db.execute_many(" ".join([
+            "UPDATE import_journal SET stage = 'parsed',",
+            "book_file = ?, cover_file = ? WHERE item_id = ?;"]),
+            [(bf.book_file_name, bf.cover_file_name, bf.journal_id)
+            for bf in book_files])
+        self._db.commit()
+
+    def set_import_stage(self, ids: list, stage: str) -> None:
+        '''
+        Set stage for journal items
+        '''
+        self._set_import_stage(ids, stage)
+        self._db.commit()
+
+    def _set_import_stage(self, ids: list, stage: str) -> None:
+        '''
+        Set stage for journal items without commit
+        '''
+        self._db.execute_many(
+            "UPDATE import_journal SET stage = ? WHERE item_id = ?;",
+            [(stage, x) for x in ids])
+
+    def reset_import_journal(self) -> list:
+        '''
+        Return queued back journal items of interrupted import which
+        library files could be written partially. Return list of dicts
+        with book_file and cover_file names.
+        '''
+        result = self._db.execute(" ".join([
+            "SELECT book_file, cover_file FROM import_journal",
+            "WHERE stage = 'parsed';"]))
+        self._db.execute(" ".join([
+            "UPDATE import_journal SET stage = 'queued', book_file = null,",
+            "cover_file = null WHERE stage = 'parsed';"]))
+        self._db.commit()
+        return result if result else []
+
+    def get_import_done_files(self) -> dict:
+        '''
+        Get scanned source files with all items imported or skipped.
+        Return dict {file path: (size, modification time in ns)}.
+        '''
+        result = self._db.execute(" ".join([
+            "SELECT path, size, mtime FROM import_journal",
+            "WHERE size IS NOT null GROUP BY path",
+            "HAVING sum(stage NOT IN ('inserted', 'skipped')) = 0;"]))
+        if not result:
+            return {}
+        return {x["path"]: (x["size"], x["mtime"]) for x in result}
+
+    def clear_import_journal(self) -> None:
+        '''
+        Delete all journal items after import finished
+        '''
+        self._db.execute("DELETE FROM import_journal;")
+        self._db.commit()
 
     ###                        ###
     ### Clean database queries ###
@@ -274,6 +791,7 @@ class DbaseInterface():
             ");",
         ]))
         self._db.commit()
+        self._uncache(Series)
 
     def del_categories_null(self) -> None:
         '''
@@ -282,86 +800,150 @@ class DbaseInterface():
         categories = self._db.execute(" ".join([
             "DELETE FROM categories WHERE category_id IN (",
             "SELECT s.category_id",
-            "FROM category s",
+            "FROM categories s",
             "LEFT JOIN books b ON b.category = s.category_id",
             "WHERE b.book_id is null",
             ");",
         ]))
         self._db.commit()
+        self._uncache(Category)
 
-    def del_authorships_null(self) -> None:
+    def del_authorships_null(self, commit: bool = True) -> None:
         '''
         Delete all authorships without books relation
         '''
-        authorships = self._db.execute(" ".join([
+        self._db.execute(" ".join([
             "DELETE FROM authorships WHERE authorship_id IN (",
             "SELECT a.authorship_id",
             "FROM authorships a",
             "LEFT JOIN books b ON b.book_id = a.book_id",
             "WHERE b.book_id is null);",
         ]))
-        self._db.commit()
+        self._uncache(Authorship)
+        if commit:
+            self._db.commit()
 
-    def del_authors_null(self) -> None:
+    def del_authors_null(self, commit: bool = True) -> None:
         '''
         Delete all authors without authorship relation
         '''
-        authors = self._db.execute(" ".join([
+        self._db.execute(" ".join([
             "DELETE FROM authors WHERE author_id IN (",
             "SELECT a.author_id",
             "FROM authors a",
             "LEFT JOIN authorships ash ON ash.author_id = a.author_id",
             "WHERE ash.authorship_id is null);",
         ]))
-        self._db.commit()
+        self._uncache(Author)
+        if commit:
+            self._db.commit()
 
     ###               ###
     ### Other queries ###
     ###               ###
 
-    def books_duplicates(self) -> [list, None]:
-        books = self._db.execute(" ".join([
-            "SELECT",
-                "a.book_id,",
-                "a.title,",
-                "'' AS authors,",
-                "a.category,",
-                "a.bookmark,",
-                "a.read_state,",
-                "a.rating,",
-                "a.time_created,",
-                "a.pub_date,",
-                "a.isbn,",
-                "a.series,",
-                "a.series_num,",
-                "a.cover,",
-                "a.file,",
-                "a.pages",
-            "FROM books a",
-            "JOIN (SELECT title, COUNT(*)",
-            "FROM books",
-            "GROUP BY title",
-            "HAVING count(*) > 1 ) b",
-            "ON a.title = b.title",
-            "ORDER BY a.title;",
-        ]))
+    def find_duplicates(self, progress: callable = None) -> list:
+        '''
+        Find clusters of near-duplicate books by similar titles and
+        first authors. Return [(similarity, [books ids]),...].
+        Progress - callback of find_near_duplicates.
+        '''
+        return find_near_duplicates(((x["book_id"], x["title"],
+            x["authors_display"]) for x in self._db.iter_query(
+            "SELECT book_id, title, authors_display FROM books;")),
+            threshold=config.duplicates_similarity, progress=progress)
+
+    def books_duplicates(self, clusters: list) -> [list, None]:
+        '''
+        Get books of near-duplicates clusters found by find_duplicates.
+        Books are ordered by clusters, similarity column - lowest
+        similarity of books linked in cluster.
+        '''
+        if not clusters:
+            return None
+        # Clusters order is kept in temporary table joined to main query
+        self._db.execute(" ".join([
+            "CREATE TEMP TABLE IF NOT EXISTS duplicates",
+            "(book_id INTEGER PRIMARY KEY, position INTEGER,",
+            "similarity REAL);"]))
+        self._db.execute("DELETE FROM temp.duplicates;")
+        self._db.execute_many(" ".join([
+            "INSERT INTO temp.duplicates (book_id, position, similarity)",
+            "VALUES (?, ?, ?);"]),
+            ((book_id, pos, score) for pos, (score, ids) in enumerate(clusters)
+                for book_id in ids))
+        books = self._db.execute(self.main_query(
+            join="JOIN temp.duplicates ON duplicates.book_id = books.book_id",
+            order="duplicates.position, books.title",
+            columns=", duplicates.similarity"), compact=True)
+        self._db.execute("DELETE FROM temp.duplicates;")
+        self._db.commit()
         if books:
             return books
         return None
 
-    def get_files(self) -> [list, None]:
+    def get_files(self) -> iter:
+        '''
+        Iterate file names for all books
+        '''
+        return self._db.iter_query("SELECT file, cover FROM books;")
+
+    def get_file_hashes(self) -> set:
         '''
-        Get all file names for books
+        Get content hashes of all books files
         '''
         result = self._db.execute(
-            ''.join([
-                "SELECT file, cover FROM books;"
-            ])
-        )
+            "SELECT file_hash FROM books WHERE file_hash IS NOT null;")
+        return {x["file_hash"] for x in result} if result else set()
+
+    def get_files_without_hash(self) -> [list, None]:
+        '''
+        Get books files added before content hash was stored
+        '''
+        result = self._db.execute(
+            "SELECT book_id, file FROM books WHERE file_hash IS null;")
         if result:
             return result
         return None
 
+    def set_files_hash(self, hashes: list) -> None:
+        '''
+        Set content hash for books. Hashes - list of (book id, hash).
+        '''
+        self._db.execute_many(
+            "UPDATE books SET file_hash = ? WHERE book_id = ?;",
+            [(file_hash, book_id) for book_id, file_hash in hashes])
+        self._db.commit()
+
+    def get_scan_files(self, folder: str) -> dict:
+        '''
+        Get scanned files manifest for folder tree.
+        Return dict {file path: (size, modification time in ns)}.
+        '''
+        # Range by path prefix to use unique path index
+        start = ''.join([folder.rstrip(os.sep), os.sep])
+        end = ''.join([start[:-1], chr(ord(os.sep) + 1)])
+        result = self._db.execute(" ".join([
+            "SELECT path, size, mtime FROM scan_files",
+            "WHERE path >= ? AND path < ?;"]), params=(start, end))
+        if not result:
+            return {}
+        return {x["path"]: (x["size"], x["mtime"]) for x in result}
+
+    def set_scan_files(self, files: dict, removed: list = None) -> None:
+        '''
+        Update scanned files manifest.
+        Files - dict {file path: (size, modification time in ns)},
+        removed - paths not found in folder anymore.
+        '''
+        self._db.execute_many(" ".join([
+            "INSERT OR REPLACE INTO scan_files (path, size, mtime)",
+            "VALUES (?, ?, ?);"]),
+            [(path, size, mtime) for path, (size, mtime) in files.items()])
+        self._db.execute_many("DELETE FROM scan_files WHERE path = ?;",
+            [(path,) for path in removed] if removed else [])
+        self._db.commit()
+
     def get_last_row(self) -> [str, int]:
         '''
         Get last row id for multiple transactions
@@ -371,20 +953,67 @@ class DbaseInterface():
 
     def update_item(self, item, kwargs) -> None:
         '''
-        Update by object
+        Update by object, reload cached object. Books with authors
+        columns rewritten by triggers are reloaded too.
         '''
         self._db.update_model(item, **kwargs)
         self._db.commit()
+        if isinstance(item, Authorship):
+            self._uncache(Authorship)
+            self._refresh(Book, [item.book_id, kwargs.get("book_id")])
+            return
+        self._refresh(item.__class__, [item.dbid])
+        if isinstance(item, Author):
+            self._refresh(Book)
 
     def del_item(self, item) -> None:
         '''
-        Delete by object
+        Delete by object, remove it from cache
         '''
         self._db.delete_model(item)
         self._db.commit()
+        if isinstance(item, Authorship):
+            self._uncache(Authorship, item.book_id)
+            self._refresh(Book, [item.book_id])
+            return
+        self._uncache(item.__class__, item.dbid)
+        if isinstance(item, Book):
+            self._uncache(Authorship, item.dbid)
+        elif isinstance(item, Author):
+            self._uncache(Authorship)
+
+    def update_many(self, items: list, kwargs: dict) -> None:
+        '''
+        Update objects of one Model by same values in one transaction,
+        reload cached objects
+        '''
+        self._success = False
+        try:
+            self._db.update_models(items, **kwargs)
+            self._db.commit()
+        except Exception:
+            self._db.rollback()
+            return
+        if items:
+            self._refresh(items[0].__class__, [x.dbid for x in items])
+        self._success = True
 
-    def _alter_table(self) -> None:
+    def delete_many(self, items: list) -> None:
         '''
-        Alter table for some modifications.
+        Delete objects of one Model in one transaction, remove them from
+        cache. Authorships and authors left without books are deleted
+        in the same transaction.
         '''
-        self._db.execute("ALTER TABLE category RENAME TO categories;")
+        self._success = False
+        try:
+            self._db.delete_models(items)
+            if items and isinstance(items[0], Book):
+                self.del_authorships_null(commit=False)
+                self.del_authors_null(commit=False)
+            self._db.commit()
+        except Exception:
+            self._db.rollback()
+            return
+        for item in items:
+            self._uncache(item.__class__, item.dbid)
+        self._success = True
@@ -0,0 +1,23 @@
+'''
+Books near-duplicates search operations.
+'''
+from app import state
+from app.modules.sqlite import Db
+from app.utils.db_operations import DbaseInterface
+
+
+def find_duplicates(job: object) -> [list, None]:
+    '''
+    Job. Find clusters of near-duplicate books in library.
+    Return [(similarity, [books ids]),...], None if cancelled.
+    '''
+    dbase = Db(state.dbase.db_file, state.dbase.pragmas)
+    db_funcs = DbaseInterface(dbase)
+    def progress(done: int, amount: int) -> bool:
+        job.progress(done, amount)
+        return job.wait()
+    try:
+        clusters = db_funcs.find_duplicates(progress)
+    finally:
+        dbase.close_connection()
+    return None if job.cancelled else clusters
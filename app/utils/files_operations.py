@@ -1,19 +1,21 @@
 '''
 Files operations module.
 '''
+import io
 import os
 import shutil
-from tempfile import mkdtemp, gettempdir
 from threading import Thread
 from secrets import token_hex
-from PIL import Image, ImageTk
+from zipfile import ZipFile, BadZipFile
 
 from app import config, state
 from app.models import BookFile
 from app.modules.clean_translit import clean_with_underscore, clean_with_space
 from app.modules.clean_translit import chars_to_ascii
-from app.modules.mupdf import get_book_info, get_cover_img, convert_to_pdf
-from app.modules.unzip_fb2 import unzip_fb2
+from app.modules.file_hash import get_file_hash
+from app.modules.mupdf import get_book_data, convert_to_pdf
+from app.modules.cover_image import load_cover, encode_cover
+from app.modules.xml_meta import get_xml_meta
 
 
 class FilesInterface():
@@ -22,7 +24,6 @@ class FilesInterface():
     '''
     def __init__(self):
         self._settings = state.app_settings
-        self._tmp_prefix: str = "booklib_" # prefix for temp directories
 
     @staticmethod
     def convert_book_to(file: str, out_path: str) -> None:
@@ -41,22 +42,40 @@ class FilesInterface():
         dst = os.path.join(out_path, out_file)
         shutil.copy2(file, dst)
 
-    def clean_temp(self) -> None:
+    def change_cover_file(self, src_file: str, book_file_name: str) -> None:
         '''
-        Clean temp files
+        Change book cover image
         '''
-        dirs = os.scandir(gettempdir())
-        for dir_ in dirs:
-            if dir_.name.startswith(self._tmp_prefix):
-                shutil.rmtree(dir_.path, ignore_errors=True)
+        cover_img = load_cover(src_file, config.max_cover_size)
+        if not cover_img:
+            return
+        self._write_cover_files(book_file_name,
+            *encode_cover(cover_img, config.thumb_size))
 
-    def change_cover_file(self, src_file: str, book_file_name: str) -> None:
+    @staticmethod
+    def scan_books_dir(folder: str) -> dict:
         '''
-        Change book cover image
+        Scan directory tree for book files.
+        Return dict {file path: (size, modification time in ns)}.
         '''
-        self._copy_cover_file(src_file, book_file_name)
+        book_exts = tuple(x[1:] for x in config.book_types)
+        files = {}
+        dirs = [os.path.abspath(folder)]
+        while dirs:
+            try:
+                entries = os.scandir(dirs.pop())
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(entry.path)
+                    elif entry.name.lower().endswith(book_exts):
+                        stat = entry.stat()
+                        files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return files
 
-    def clean_lib_files(self, db_files: list) -> None:
+    def clean_lib_files(self, db_files: set) -> None:
         '''
         Clean library files not linked to database files.
         '''
@@ -70,23 +89,77 @@ class FilesInterface():
                 if not file.name in db_files or size == 0:
                     os_remove(file.path)
 
-    def get_book_file_data(self, src_file: str) -> [object, None]:
+    @staticmethod
+    def expand_archives(files: list) -> tuple:
+        '''
+        Replace zip archives in files list with items for each book
+        in archive - (archive path, book file name in archive).
+        Return items and list of archives without books.
+        '''
+        book_exts = tuple(x[1:] for x in config.book_types
+            if not x.endswith(".zip"))
+        items, empty = [], []
+        for file in files:
+            if not file.lower().endswith(".zip"):
+                items.append(file)
+                continue
+            try:
+                with ZipFile(file) as zip_file:
+                    members = [x for x in zip_file.namelist()
+                        if x.lower().endswith(book_exts)]
+            except (OSError, BadZipFile):
+                members = []
+            items += [(file, x) for x in members]
+            if not members:
+                empty.append(file)
+        return (items, empty)
+
+    def get_book_file_data(self, src_item: [str, tuple],
+        known_hashes: set = None) -> [object, None]:
         '''
         Parse files for metadata, return book file object.
+        Source item is file path or (archive path, book file name in
+        archive), archived book read to memory without temp files.
+        If file content hash in known_hashes, return book file object
+        marked as duplicate without parsing.
         '''
+        src_file, member = (src_item if isinstance(src_item, tuple)
+            else (src_item, None))
         src_file = os.path.normpath(src_file)
-        file_name = os.path.split(src_file)[1]
-
-        # Uncompress fb2.zip
-        if src_file.endswith(".fb2.zip"):
-            tmp_file = unzip_fb2(src_file, prefix=self._tmp_prefix)
-            src_file = tmp_file if tmp_file else src_file
-
-        # Get book info from meta data
-        meta_title = meta_authors = date = None
-        pages = 0
-        if any(src_file.endswith(x) for x in (".pdf", ".epub", ".fb2")):
-            meta_title, meta_authors, date, pages = get_book_info(src_file)
+        if member:
+            with ZipFile(src_file) as zip_file:
+                data = zip_file.read(member)
+            file_name = os.path.basename(member)
+            file_hash = get_file_hash(io.BytesIO(data))
+        else:
+            data = None
+            file_name = os.path.split(src_file)[1]
+            file_hash = get_file_hash(src_file)
+
+        if known_hashes and file_hash in known_hashes:
+            book_file = BookFile(src_file, None, 0)
+            book_file.src_member = member
+            book_file.file_hash, book_file.duplicate = file_hash, True
+            return book_file
+
+        # Get book info from meta data and cover with single file open.
+        # Epub and fb2 metadata and cover read without document load,
+        # document gives page count and parts missing in metadata.
+        filetype = os.path.splitext(file_name)[1][1:].lower()
+        meta = (get_xml_meta(data if data else src_file, filetype)
+            or (None, None, None, None))
+        cover_img = (load_cover(meta[3], config.max_cover_size) if meta[3]
+            else None)
+        meta_title, meta_authors, date, pages, doc_cover = get_book_data(
+            data if data else src_file, max_size=config.max_cover_size,
+            filetype=filetype, cover=not cover_img)
+        meta_title = meta[0] if meta[0] else meta_title
+        meta_authors = meta[1] if meta[1] else meta_authors
+        date = meta[2] if meta[2] else date
+        cover_img = cover_img if cover_img else doc_cover
+        if not any(file_name.endswith(x) for x in (".pdf", ".epub", ".fb2")):
+            meta_title = meta_authors = date = None
+            pages = 0
         # Get book info from file name
         if not all([meta_title, meta_authors]):
             file_title, file_authors = self._get_info_from_file(file_name)
@@ -95,10 +168,13 @@ class FilesInterface():
         cover_filename = ''.join([os.path.splitext(book_filename)[0], ".png" ])
 
         book_file = BookFile(src_file, date, pages)
+        book_file.src_member = member
         book_file.title = meta_title if meta_title else file_title
         book_file.authors = meta_authors if meta_authors else file_authors
         book_file.book_file_name = book_filename
         book_file.cover_file_name = cover_filename
+        book_file.file_hash = file_hash
+        book_file.cover_img = cover_img
 
         return book_file
 
@@ -123,28 +199,74 @@ class FilesInterface():
             file_authors = [["Unknown", "Unknown"],] # make list
         return (file_title, file_authors)
 
-    def _check_rename_filename(self, file_name: str) -> str:
+    def _check_rename_filename(self, file_name: str,
+        reserved: set = None) -> str:
         '''
-        If same file exists in library, add suffix and return new name.
+        If same file exists in library or name is reserved,
+        add suffix and return new name.
         '''
         file_name = chars_to_ascii(clean_with_underscore(file_name)).lower()
         dst_file = os.path.join(self._settings["lib_books"], file_name)
-        if os.path.exists(dst_file):
+        if os.path.exists(dst_file) or (reserved and file_name in reserved):
             file, ext = os.path.splitext(file_name)
             file_name = ''.join([file, "_",token_hex(4), ext])
         return file_name
 
+    def rename_book_file(self, book_file: object,
+        reserved: set = None) -> None:
+        '''
+        Check book file name again before copying.
+        Names are set by import workers in parallel, so two books with
+        the same file name could get the same library name.
+        Reserved - names of books not copied yet, new name added to it.
+        '''
+        book_filename = self._check_rename_filename(book_file.book_file_name,
+            reserved)
+        if reserved is not None:
+            reserved.add(book_filename)
+        if book_filename == book_file.book_file_name:
+            return
+        book_file.book_file_name = book_filename
+        book_file.cover_file_name = ''.join(
+            [os.path.splitext(book_filename)[0], ".png" ])
+
+    def prepare_cover_files(self, book_file: object) -> None:
+        '''
+        Encode cover extracted with book data and its thumbnail in memory.
+        Called from import workers, files written to library by
+        copy_book_files.
+        '''
+        cover_img, book_file.cover_img = book_file.cover_img, None
+        if not cover_img:
+            return
+        book_file.cover_data, book_file.thumb_data = encode_cover(
+            cover_img, config.thumb_size)
+
     def copy_book_files(self, book_file: object) -> None:
         '''
-        Copy book file and cover to library
+        Copy book file, write cover and thumbnail to library
         '''
         self._copy_book_file(book_file)
-        # Get cover from book file
-        cover_tmp = get_cover_img(
-            book_file.src_file, max_size=config.max_cover_size,
-            prefix=self._tmp_prefix)
-        # Copy cover file and make thumbnail
-        self._copy_cover_file(cover_tmp, book_file.cover_file_name)
+        if book_file.cover_data:
+            self._write_cover_files(book_file.cover_file_name,
+                book_file.cover_data, book_file.thumb_data)
+        # Book file waits for database batch, do not keep images
+        book_file.cover_data = book_file.thumb_data = None
+
+    def remove_book_files(self, book_file_name: str,
+        cover_file_name: str) -> None:
+        '''
+        Remove copied book file, cover and thumbnail from library.
+        Used when book was not added to database.
+        '''
+        files = [("lib_books", book_file_name),
+            ("lib_covers", cover_file_name),
+            ("lib_thumbs", cover_file_name)]
+        for lib_dir, file_name in files:
+            try:
+                os.remove(os.path.join(self._settings[lib_dir], file_name))
+            except OSError:
+                pass
 
     def _copy_book_file(self, book_file: object) -> None:
         '''
@@ -152,49 +274,21 @@ class FilesInterface():
         '''
         dst_file = os.path.join(self._settings["lib_books"],
             book_file.book_file_name)
-        shutil.copy2(book_file.src_file, dst_file)
+        if not book_file.src_member:
+            shutil.copy2(book_file.src_file, dst_file)
+            return
+        with ZipFile(book_file.src_file) as zip_file:
+            with zip_file.open(book_file.src_member) as src, open(
+                dst_file, "wb") as dst:
+                shutil.copyfileobj(src, dst)
 
-    def _copy_cover_file(self, src_file: str, new_cover_file: str) -> None:
+    def _write_cover_files(self, cover_file_name: str, cover_data: bytes,
+        thumb_data: bytes) -> None:
         '''
-        Copy cover file and created thumbnail to library.
+        Write encoded cover and thumbnail to library.
         '''
-        if not src_file:
-            return
-        # Convert cover to png if it has other extension
-        if os.path.splitext(src_file)[-1] != ".png":
-            src_file = self._convert_cover(src_file)
-            if not src_file:
-                return
-        dst_cover = os.path.join(self._settings["lib_covers"], new_cover_file)
-        shutil.copy2(src_file, dst_cover)
-        self._make_thumbnail(src_file, new_cover_file)
-
-    def _convert_cover(self, src_file: str) -> str:
-        '''
-        Convert covers to png format
-        '''
-        tmp_path = os.path.normpath(mkdtemp(prefix=self._tmp_prefix))
-        new_cover_file = os.path.join(tmp_path, "book_cover.png")
-        try:
-            with Image.open(src_file) as im:
-                if not im.mode == "RGB":
-                    im = im.convert("RGB")
-                im.save(new_cover_file)
-        except:
-            return None
-        return new_cover_file
-
-    def _make_thumbnail(self, src_file: str, new_cover_file: str) -> None:
-        '''
-        Create thumbnail image
-        '''
-        try:
-            thumb_img = os.path.join(self._settings["lib_thumbs"],
-                new_cover_file)
-            with Image.open(src_file) as im:
-                if not im.mode == "RGB":
-                    im = im.convert("RGB")
-                im.thumbnail(config.thumb_size)
-                im.save(thumb_img)
-        except:
-            pass
+        for lib_dir, data in (("lib_covers", cover_data),
+            ("lib_thumbs", thumb_data)):
+            with open(os.path.join(self._settings[lib_dir], cover_file_name),
+                "wb") as file:
+                file.write(data)
@@ -0,0 +1,252 @@
+'''
+Books import operations.
+'''
+import os
+
+from app import config, state
+from app.modules.file_hash import get_file_hash
+from app.modules.sqlite import Db
+from app.utils.db_operations import DbaseInterface
+from app.utils.files_operations import FilesInterface
+from app.utils.job_runner import WorkerPool
+
+_known_hashes = set() # library files hashes, set in worker process
+
+
+class ImportWriter():
+    '''
+    Writer of parsed books for import job, the only writer of database
+    rows and library files. Books are written by batches: library names
+    are stored in import journal first, then files are copied and books
+    rows added in one transaction with journal stages.
+    '''
+    def __init__(self, job: object, db_funcs: object, fd_funcs: object,
+        items_ids: dict):
+        self._job, self._db_funcs, self._fd_funcs = job, db_funcs, fd_funcs
+        self._items_ids = items_ids # {source item: journal item id}
+        self._authors_ids = db_funcs.get_authors_ids()
+        self._batch, self._reserved = [], set()
+        self._skipped, self._failed = [], [] # journal ids
+
+        # Public methods: add, flush
+
+    def add(self, src_item: [str, tuple], book_file: [object, None]) -> None:
+        '''
+        Add parsed book to batch, write batch if full.
+        '''
+        if not book_file:
+            self._fail(src_item, "Unable to read book file")
+            return
+        if book_file.duplicate:
+            self._skip(src_item)
+            return
+        book_file.journal_id = self._items_ids[src_item]
+        self._fd_funcs.rename_book_file(book_file, self._reserved)
+        self._batch.append((src_item, book_file))
+        if len(self._batch) >= config.import_batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        '''
+        Write batch of books and stages of skipped and failed items.
+        '''
+        batch, self._batch, self._reserved = self._batch, [], set()
+        if batch:
+            self._write_batch(batch)
+        for stage, ids in (("skipped", self._skipped),
+            ("failed", self._failed)):
+            if ids:
+                self._db_funcs.set_import_stage(ids, stage)
+        self._skipped, self._failed = [], []
+
+    def _write_batch(self, batch: list) -> None:
+        '''
+        Copy books files and add books to database.
+        Batch - list of (source item, book file object).
+        '''
+        # Store names before writing files to remove them if interrupted
+        self._db_funcs.set_import_parsed([x[1] for x in batch])
+        copied = []
+        for src_item, book_file in batch:
+            try:
+                self._fd_funcs.copy_book_files(book_file)
+            except OSError as err:
+                self._remove_files(book_file)
+                self._fail(src_item, str(err))
+                continue
+            copied.append((src_item, book_file))
+        self._db_funcs.add_books([x[1] for x in copied], self._authors_ids)
+        success = self._db_funcs.success
+        for src_item, book_file in copied:
+            if success and not book_file.duplicate:
+                continue
+            # Remove files of duplicates and books not added to database
+            self._remove_files(book_file)
+            if book_file.duplicate:
+                self._skip(src_item)
+            else:
+                self._fail(src_item, "Unable to add book to database")
+
+    def _remove_files(self, book_file: object) -> None:
+        '''
+        Remove library files of book not added to database.
+        '''
+        self._fd_funcs.remove_book_files(book_file.book_file_name,
+            book_file.cover_file_name)
+
+    def _skip(self, src_item: [str, tuple]) -> None:
+        '''
+        Report skipped item.
+        '''
+        self._job.skip(_item_name(src_item))
+        self._skipped.append(self._items_ids[src_item])
+
+    def _fail(self, src_item: [str, tuple], text: str) -> None:
+        '''
+        Report item with error.
+        '''
+        self._job.error(_item_name(src_item), text)
+        self._failed.append(self._items_ids[src_item])
+
+
+def import_books(job: object, files: [list, None], folder: str = None,
+    resume: bool = False) -> None:
+    '''
+    Job. Import books files to library. Runs in job thread with own
+    database connection.
+    If folder set, scan it and import only files new or changed
+    since previous scan. Each book in zip archives imported as own item.
+    Items stages are stored in import journal, if resume set - continue
+    interrupted import from journal.
+    '''
+    dbase = Db(state.dbase.db_file, state.dbase.pragmas)
+    db_funcs, fd_funcs = DbaseInterface(dbase), FilesInterface()
+    try:
+        # Hash library files added before hashes were stored, import
+        # journal is not changed if cancelled
+        lib_files = db_funcs.get_files_without_hash()
+        if lib_files and not _hash_lib_files(job, db_funcs, lib_files):
+            return
+        removed = []
+        if resume:
+            items_ids = db_funcs.get_import_queue()
+        else:
+            items_ids, removed = _start_import(job, db_funcs, fd_funcs,
+                files, folder)
+        items = list(items_ids)
+        items_len = len(items)
+        known_hashes = db_funcs.get_file_hashes()
+        writer = ImportWriter(job, db_funcs, fd_funcs, items_ids)
+        # Workers extract metadata, covers and thumbnails, writer is
+        # the only one changing database rows and library files
+        with WorkerPool(items_len, _init_worker,
+            (state.app_settings, known_hashes)) as pool:
+            for idx, (src_item, book_file) in enumerate(
+                pool.map(parse_book_file, items, job)):
+                if not job.wait():
+                    break
+                job.progress(idx, items_len)
+                writer.add(src_item, book_file)
+            # Parsed items are written on cancel too
+            writer.flush()
+        # Store imported files, files with errors are retried at next scan
+        db_funcs.set_scan_files(db_funcs.get_import_done_files(), removed)
+        db_funcs.clear_import_journal()
+    finally:
+        dbase.close_connection()
+
+def _hash_lib_files(job: object, db_funcs: object, books: list) -> bool:
+    '''
+    Store content hashes of library files added before hashes were
+    stored. Files are hashed by workers, hashes are written by batches,
+    so cancelled hashing continues at next import.
+    Return False if job cancelled.
+    '''
+    lib_books = state.app_settings["lib_books"]
+    items = [(x["book_id"], os.path.join(lib_books, x["file"]))
+        for x in books]
+    items_len, hashes = len(items), []
+    with WorkerPool(items_len) as pool:
+        for idx, (item, file_hash) in enumerate(
+            pool.map(hash_lib_file, items, job)):
+            if not job.wait():
+                break
+            job.progress(idx, items_len)
+            if file_hash:
+                hashes.append((item[0], file_hash))
+            if len(hashes) >= config.import_batch_size:
+                db_funcs.set_files_hash(hashes)
+                hashes = []
+    db_funcs.set_files_hash(hashes)
+    return not job.cancelled
+
+def _start_import(job: object, db_funcs: object, fd_funcs: object,
+    files: [list, None], folder: [str, None]) -> tuple:
+    '''
+    Get import items and fill new import journal.
+    Return ({item: journal item id}, removed from folder files).
+    '''
+    scanned, removed = None, []
+    if folder:
+        scanned = fd_funcs.scan_books_dir(folder)
+        manifest = db_funcs.get_scan_files(folder)
+        files = [x for x in scanned if manifest.get(x) != scanned[x]]
+        removed = [x for x in manifest if x not in scanned]
+    items, empty = fd_funcs.expand_archives(files)
+    db_funcs.clear_import_journal()
+    db_funcs.add_import_items(empty, scanned, stage="skipped")
+    for file in empty:
+        job.skip(file)
+    return (db_funcs.add_import_items(items, scanned), removed)
+
+def rollback_import() -> int:
+    '''
+    Remove library files written by interrupted import for books not
+    added to database. Return number of items left to import.
+    '''
+    db_funcs, fd_funcs = DbaseInterface(), FilesInterface()
+    lib_files = {x["file"] for x in db_funcs.get_files()}
+    for item in db_funcs.reset_import_journal():
+        if item["book_file"] not in lib_files:
+            fd_funcs.remove_book_files(item["book_file"], item["cover_file"])
+    return len(db_funcs.get_import_queue())
+
+def _item_file(src_item: [str, tuple]) -> str:
+    '''
+    Return path of book file or archive for import item.
+    '''
+    return src_item[0] if isinstance(src_item, tuple) else src_item
+
+def _item_name(src_item: [str, tuple]) -> str:
+    '''
+    Return import item name for messages.
+    '''
+    return (os.path.join(*src_item) if isinstance(src_item, tuple)
+        else src_item)
+
+def _init_worker(app_settings: dict, known_hashes: set) -> None:
+    '''
+    Set app state and library files hashes for worker process.
+    '''
+    global _known_hashes
+    state.app_settings = app_settings
+    _known_hashes = known_hashes
+
+def parse_book_file(src_item: [str, tuple]) -> [object, None]:
+    '''
+    Worker. Get book file data and prepare cover files.
+    '''
+    fd_funcs = FilesInterface()
+    try:
+        book_file = fd_funcs.get_book_file_data(src_item, _known_hashes)
+        if book_file and not book_file.duplicate:
+            fd_funcs.prepare_cover_files(book_file)
+    except Exception:
+        return None
+    return book_file
+
+def hash_lib_file(item: tuple) -> [str, None]:
+    '''
+    Worker. Get content hash of library file, item - (book id, path).
+    '''
+    return get_file_hash(item[1])
@@ -0,0 +1,217 @@
+'''
+Background jobs module.
+'''
+import gc
+import os
+from concurrent.futures import (ProcessPoolExecutor, wait,
+    FIRST_COMPLETED)
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from queue import Queue, Empty
+from threading import Thread, Event
+
+from app import config, state
+
+_end = object() # end of items marker
+
+class Job():
+    '''
+    Background job running target function in thread.
+    Target is called as target(job, *args) and reports progress, errors
+    through job methods, its returned value is stored in result.
+    Events are put to queue and read by Tk loop with get_events.
+    Target should call job.wait() between items to support pause and
+    cancel.
+    '''
+    def __init__(self, target: callable, *args):
+        self._target, self._args = target, args
+        self._queue = Queue()
+        self._cancel = Event()
+        self._resume = Event()
+        self._resume.set()
+        self._thread = Thread(target=self._run, daemon=True)
+        self.errors = [] # (file, error text) reported by target
+        self.skipped = [] # files skipped by target
+        self.result = None # value returned by target
+
+    def start(self) -> None:
+        '''
+        Start job thread.
+        '''
+        self._thread.start()
+
+    def _run(self) -> None:
+        '''
+        Run target, always post done event.
+        '''
+        try:
+            self.result = self._target(self, *self._args)
+        except Exception as err:
+            self.error(None, str(err))
+        finally:
+            self._queue.put(("done",))
+
+    @property
+    def cancelled(self) -> bool:
+        '''
+        Return True if job cancelled.
+        '''
+        return self._cancel.is_set()
+
+    @property
+    def paused(self) -> bool:
+        '''
+        Return True if job paused.
+        '''
+        return not self._resume.is_set()
+
+    def cancel(self) -> None:
+        '''
+        Cancel job. Resume paused job to let it stop.
+        '''
+        self._cancel.set()
+        self._resume.set()
+
+    def pause(self) -> None:
+        '''
+        Switch pause state.
+        '''
+        if self.paused:
+            self._resume.set()
+        else:
+            self._resume.clear()
+
+    def wait(self) -> bool:
+        '''
+        Called from target. Block while paused, return False if cancelled.
+        '''
+        self._resume.wait()
+        return not self.cancelled
+
+    def progress(self, num_of_amount: int, amount: int) -> None:
+        '''
+        Called from target. Post progress event.
+        '''
+        self._queue.put(("progress", num_of_amount, amount))
+
+    def error(self, file: [str, None], text: str) -> None:
+        '''
+        Called from target. Post error event for file.
+        '''
+        self.errors.append((file, text))
+        self._queue.put(("error", file, text))
+
+    def skip(self, file: str) -> None:
+        '''
+        Called from target. Post skipped file event.
+        '''
+        self.skipped.append(file)
+        self._queue.put(("skip", file))
+
+    def get_events(self) -> list:
+        '''
+        Return all posted events without blocking.
+        '''
+        events = []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except Empty:
+                return events
+
+
+class WorkerPool():
+    '''
+    Process pool for CPU heavy parts of jobs, used as context manager.
+    Workers count from settings or config, 0 - all CPU cores.
+    Limited number of tasks is submitted ahead of results consumer, so
+    paused job stops workers and results are not piled in memory.
+    Pool is restarted if worker process dies, items of lost tasks are
+    retried one by one to find item killing worker.
+    '''
+    def __init__(self, items_len: int, initializer: callable = None,
+        initargs: tuple = ()):
+        workers = (state.app_settings.get("import_workers")
+            or config.import_workers or os.cpu_count() or 1)
+        self._workers = max(1, min(workers, items_len))
+        self._window = self._workers * 2 # tasks submitted not consumed
+        self._initializer, self._initargs = initializer, initargs
+        self._poll_s = 0.5 # results waiting interval to check cancel
+        self._pool = None
+
+    def __enter__(self):
+        self._start()
+        return self
+
+    def __exit__(self, *args):
+        self._stop()
+
+    def _stop(self) -> None:
+        '''
+        Stop pool, kill workers of cancelled job busy with tasks.
+        '''
+        # Executor has no public terminate before Python 3.14
+        pool, self._pool = self._pool, None
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+        # Workers are dead, so waiting only joins the manager thread
+        pool.shutdown(wait=True, cancel_futures=True)
+        # Stopped pool is kept by reference cycles, its closed wakeup
+        # pipe is used by executors exit handler until collected
+        del pool
+        gc.collect()
+
+    def _start(self) -> None:
+        '''
+        Start new pool of workers.
+        '''
+        # Spawn workers - forking process with Tk and threads is unsafe
+        self._pool = ProcessPoolExecutor(self._workers,
+            mp_context=get_context("spawn"),
+            initializer=self._initializer, initargs=self._initargs)
+
+    def map(self, func: callable, items: list, job: object = None) -> iter:
+        '''
+        Yield (item, func result) for items in completion order, result
+        is None if func failed or worker died on item. Next item is
+        submitted after consumer took result of previous one. Stop if
+        job cancelled. Func should be module level function.
+        '''
+        items, pending = iter(items), {} # {future: item}
+        suspects = [] # items of tasks lost with died worker
+        while True:
+            # Suspects run alone, worker died on single task is its item
+            while suspects and not pending:
+                item = suspects.pop()
+                pending[self._pool.submit(func, item)] = item
+            while not suspects and len(pending) < self._window:
+                item = next(items, _end)
+                if item is _end:
+                    break
+                pending[self._pool.submit(func, item)] = item
+            if not pending:
+                return
+            done, _ = wait(pending, timeout=self._poll_s,
+                return_when=FIRST_COMPLETED)
+            if job and job.cancelled:
+                return
+            broken = []
+            for future in done:
+                item = pending.pop(future)
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    broken.append(item)
+                    continue
+                except Exception:
+                    result = None
+                yield (item, result)
+            if not broken:
+                continue
+            if len(broken) == 1 and not pending:
+                yield (broken[0], None)
+            else:
+                suspects.extend([*broken, *pending.values()])
+            pending.clear()
+            self._stop()
+            self._start()
@@ -0,0 +1,114 @@
+'''
+Database schema migrations.
+Each migration upgrades database by one version, database version
+stored in PRAGMA user_version. Migrations should be safe to run on
+databases partially upgraded by older app versions.
+'''
+from app.models import (Book, Authorship, ScanFile, ImportItem, BookSearch,
+    BookContent, BookSort, BookAuthors)
+
+
+def _rename_category(dbase: object) -> None:
+    '''
+    Rename category table of first versions to categories.
+    '''
+    tables = dbase.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table';")
+    names = {x["name"] for x in tables} if tables else set()
+    if "category" in names and "categories" not in names:
+        dbase.execute("ALTER TABLE category RENAME TO categories;")
+
+def _add_import_tables(dbase: object) -> None:
+    '''
+    Add books file hash, scanned files manifest and import journal.
+    '''
+    dbase.add_columns(Book)
+    dbase.create_table(ScanFile)
+    dbase.create_table(ImportItem)
+
+def _add_indexes(dbase: object) -> None:
+    '''
+    Add secondary indexes for books joins, filters and sorting.
+    '''
+    for Model in (Book, Authorship):
+        dbase.create_indexes(Model)
+
+def _add_books_search(dbase: object) -> None:
+    '''
+    Add full-text search index of books and fill it.
+    '''
+    exists = dbase.execute(" ".join(["SELECT name FROM sqlite_master",
+        "WHERE name = ?;"]), params=(BookSearch.__tablename__,))
+    for query in BookSearch.__schema__:
+        dbase.execute(query)
+    if not exists:
+        dbase.execute(BookSearch.__fill__)
+
+def _add_books_content(dbase: object) -> None:
+    '''
+    Add books content index, books are indexed by content indexing job.
+    '''
+    dbase.add_columns(Book)
+    for query in BookContent.__schema__:
+        dbase.execute(query)
+
+def _add_sort_keys(dbase: object) -> None:
+    '''
+    Add books sort keys columns with indexes and fill them.
+    '''
+    dbase.add_columns(Book)
+    for query in BookSort.__schema__:
+        dbase.execute(query)
+    dbase.execute(BookSort.__fill__)
+    dbase.create_indexes(Book)
+
+def _add_authors_display(dbase: object) -> None:
+    '''
+    Add books authors names column and fill it.
+    '''
+    dbase.add_columns(Book)
+    for query in BookAuthors.__schema__:
+        dbase.execute(query)
+    dbase.execute(BookAuthors.__fill__)
+
+def _add_authorships_update(dbase: object) -> None:
+    '''
+    Add triggers for changed authorships, refill authors names and
+    sort keys.
+    '''
+    for query in (*BookSearch.__schema__, *BookSort.__schema__):
+        dbase.execute(query)
+    dbase.execute(BookSort.__fill__)
+    for query in BookAuthors.__schema__:
+        dbase.execute(query)
+    dbase.execute(BookAuthors.__fill__)
+
+
+def _casefold_sort_keys(dbase: object) -> None:
+    '''
+    Recreate sort keys triggers folding case of all letters, refill
+    sort keys.
+    '''
+    for query in BookSort.__schema__:
+        # Trigger name follows CREATE TRIGGER IF NOT EXISTS
+        dbase.execute(''.join(["DROP TRIGGER IF EXISTS ", query.split()[5],
+            ";"]))
+        dbase.execute(query)
+    dbase.execute(BookSort.__fill__)
+
+
+# Migration for version is at index version - 1
+MIGRATIONS = (_rename_category, _add_import_tables, _add_indexes,
+    _add_books_search, _add_books_content, _add_sort_keys,
+    _add_authors_display, _add_authorships_update, _casefold_sort_keys)
+
+
+def migrate(dbase: object) -> None:
+    '''
+    Apply migrations newer than database version.
+    '''
+    version = dbase.get_user_version()
+    for idx, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        migration(dbase)
+        dbase.set_user_version(idx)
+        dbase.commit()
@@ -0,0 +1,93 @@
+'''
+Benchmark of database connection profile.
+Compare default SQLite connection with config.db_pragmas on books
+import (per book commits and batched import) and main query latency.
+Run from repository root: python -m benchmarks.db_profile [books number]
+'''
+import os
+import sys
+import tempfile
+from datetime import date
+from statistics import median
+from time import perf_counter
+
+from app import config, state, init_database
+from app.models import BookFile
+from app.modules.sqlite import Db
+from app.utils.db_operations import DbaseInterface
+
+
+def make_book_files(start: int, amount: int) -> list:
+    '''
+    Create synthetic parsed book files.
+    '''
+    book_files = []
+    for idx in range(start, start + amount):
+        book_file = BookFile("", date(2000 + idx % 20, 1, 1), idx % 500)
+        book_file.title = ' '.join(["Book title", str(idx)])
+        book_file.authors = [["First", ''.join(["Last", str(idx % 997)])]]
+        book_file.book_file_name = ''.join(["book_", str(idx), ".pdf"])
+        book_file.cover_file_name = ''.join(["book_", str(idx), ".png"])
+        book_file.file_hash = ''.join(["hash", str(idx)])
+        book_files.append(book_file)
+    return book_files
+
+def bench_profile(pragmas: tuple, books_len: int) -> dict:
+    '''
+    Return timings for connection pragmas in new database.
+    '''
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dbase = Db(os.path.join(tmp_dir, config.db_filename), pragmas)
+        init_database(dbase)
+        state.dbase = dbase
+        db_funcs = DbaseInterface(dbase)
+
+        # Commit per book, as import worked before batches
+        single_len = min(500, books_len)
+        start = perf_counter()
+        for book_file in make_book_files(0, single_len):
+            db_funcs.add_book(book_file)
+        results["add_book, ms/book"] = (
+            (perf_counter() - start) * 1000 / single_len)
+
+        authors_ids = db_funcs.get_authors_ids()
+        book_files = make_book_files(single_len, books_len)
+        batch_size = config.import_batch_size
+        start = perf_counter()
+        for idx in range(0, len(book_files), batch_size):
+            db_funcs.add_books(book_files[idx:idx + batch_size], authors_ids)
+        results["add_books, ms/book"] = (
+            (perf_counter() - start) * 1000 / books_len)
+
+        for name_, search in (("all books", None),
+            ("title search", ("title 12", "title"))):
+            timings = []
+            for _ in range(5):
+                start = perf_counter()
+                db_funcs.get_books(search=search)
+                timings.append(perf_counter() - start)
+            results[''.join(["main query ", name_, ", ms"])] = (
+                median(timings) * 1000)
+        dbase.close_connection()
+    return results
+
+def main() -> None:
+    '''
+    Run benchmark and print results table.
+    '''
+    books_len = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    profiles = (("default", ()), ("config", config.db_pragmas))
+    results = {name_: bench_profile(pragmas, books_len)
+        for name_, pragmas in profiles}
+    print(' '.join(["Books:", str(books_len),
+        "Batch size:", str(config.import_batch_size)]))
+    print(''.join(["{:<30}".format(""),
+        *("{:>12}".format(x) for x, _ in profiles)]))
+    for key in results["default"]:
+        print(''.join(["{:<30}".format(key),
+            *("{:>12.3f}".format(results[x][key]) for x, _ in profiles)]))
+
+
+if __name__ == "__main__":
+    main()